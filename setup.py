@@ -31,6 +31,14 @@ setup(
         'celery[redis]'
     ],
 
+    # Define optional dependencies.
+    extras_require={
+        'metrics': ['prometheus_client'],
+        'tracing': ['opentelemetry-api'],
+        'analytics': ['numpy', 'backports.zoneinfo; python_version < "3.9"'],
+        'fast': ['orjson']
+    },
+
     package_dir={'': 'src'},
     packages=find_packages(where='src'),
 
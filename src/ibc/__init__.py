@@ -1,15 +1,24 @@
 from enum import Enum
-import json
 import requests
+import time
 import logging
 import urllib3
 
+from typing import Any
 from typing import Dict
+from typing import Iterator
 from urllib3.exceptions import InsecureRequestWarning
 from fake_useragent import UserAgent
 urllib3.disable_warnings(category=InsecureRequestWarning)
 
 from .celery import app
+from . import metrics
+from . import tracing
+from . import log
+from . import decoding
+from . import gateways
+from . import capture
+from . import limiter
 
 
 RESOURCE_URL = "https://ibgw:5000/v1"
@@ -157,6 +166,30 @@ class MarketDataFields(Enum):
     ]
 
 
+class FieldProfiles(Enum):
+    """Represents named subsets of the `MarketDataFields`
+    for the `MarketDataSnapshot` service.
+
+    ### Usage
+    ----
+        >>> from src.enums import FieldProfiles
+        >>> FieldProfiles.Quote.value
+    """
+
+    Quote = [
+        '31', '84', '85', '86', '88', '7059', '87', '82', '83', '70', '71', '7295', '7741'
+    ]
+    Greeks = [
+        '31', '7308', '7309', '7310', '7311', '7633', '7283', '7635'
+    ]
+    Fundamentals = [
+        '55', '7051', '7280', '7281', '7289', '7290', '7291', '7286', '7287', '7293', '7294', '7718', '7282'
+    ]
+    DepthLite = [
+        '84', '85', '86', '88', '7068', '7057', '31', '7059', '7058'
+    ]
+
+
 class BarTypes(Enum):
     """Represents the bar types for the
     `MarketDataHistory` service.
@@ -277,26 +310,60 @@ def make_request(method: str, endpoint: str, params: dict = None, json_payload:
     headers = {"Content-Type": "application/json",
                "User-Agent": UserAgent().ff}
 
-    logging.info(msg="------------------------")
-    logging.info(msg=f"JSON Payload: {json_payload}")
-    logging.info(msg=f"Request Method: {method}")
+    # Bodies are passed as arguments, so they are only formatted if the record is emitted.
+    logging.debug('Request: %s %s, params: %s, payload: %s', method, url, params, log.Body(json_payload, limit=None))
 
     # Make the request.
-    if method == 'post':
-        response = requests.post(url=url, params=params, json=json_payload, verify=False, headers=headers)
-    elif method == 'get':
-        response = requests.get(url=url, params=params, json=json_payload, verify=False, headers=headers)
-    elif method == 'delete':
-        response = requests.delete(url=url, params=params, json=json_payload, verify=False, headers=headers)
-
-    logging.info(msg="URL: {url}".format(url=url))
-    logging.info(msg=f'Response Status Code: {response.status_code}')
-    logging.info(msg=f'Response Content: {response.text}')
+    template = metrics.endpoint_template(endpoint)
+    limits = limiter.adaptive
+    if limits is not None:
+        limits.acquire(template)
+
+    with tracing.request_span(method, template) as span:
+        start = time.perf_counter()
+        response = None
+        try:
+            if gateways.pool is not None:
+                response = gateways.pool.request(method.upper(), endpoint,
+                                                 account_id=gateways.account_of(endpoint, params, json_payload),
+                                                 contract_id=gateways.contract_of(endpoint, params),
+                                                 params=params, json=json_payload, headers=headers)
+            elif method == 'post':
+                response = requests.post(url=url, params=params, json=json_payload, verify=False, headers=headers)
+            elif method == 'get':
+                response = requests.get(url=url, params=params, json=json_payload, verify=False, headers=headers)
+            elif method == 'delete':
+                response = requests.delete(url=url, params=params, json=json_payload, verify=False, headers=headers)
+        except requests.RequestException:
+            metrics.sink.observe_request(method, template, 0, time.perf_counter() - start, 0, 0)
+            raise
+        finally:
+            if limits is not None:
+                limits.release(template, 0 if response is None else response.status_code,
+                               time.perf_counter() - start)
+
+        # Record the request metrics.
+        elapsed = time.perf_counter() - start
+        metrics.sink.observe_request(method, template, response.status_code, elapsed,
+                                     len(response.request.body or b''), len(response.content))
+
+        if span is not None:
+            span.set_attribute('http.status_code', response.status_code)
+
+    if capture.recorder is not None:
+        capture.recorder.record(method, endpoint, params, json_payload, response.status_code, elapsed,
+                                response.content)
+
+    if response.ok:
+        if log.sampled():
+            logging.info('%s %s -> %s in %.1f ms, payload: %s, response: %s', method, url, response.status_code,
+                          elapsed * 1000, log.Body(json_payload), log.Body(response.content))
+        logging.debug('Response Content: %s', log.Body(response.content, limit=None))
 
     # If it's okay and no details.
     if response.ok and len(response.content) > 0:
 
-        return response.json()
+        return decoding.decode(response.content)
 
     elif len(response.content) > 0 and response.ok:
 
@@ -305,27 +372,151 @@ def make_request(method: str, endpoint: str, params: dict = None, json_payload:
                 }
 
     elif not response.ok and endpoint =='/api/iserver/account':
-        return response.json()
+        return decoding.decode(response.content)
 
     elif not response.ok:
 
-        if len(response.content) == 0:
-            response_data = ''
-        else:
-            try:
-                response_data = response.json()
-            except:
-                response_data = {'content': response.text}
-
-        # Define the error dict.
-        error_dict = {'error_code': response.status_code,
-                      'response_url': response.url,
-                      'response_body': response_data,
-                      'response_request': dict(response.request.headers),
-                      'response_method': response.request.method,
-                      }
-
-        # Log the error.
-        logging.error(msg=json.dumps(obj=error_dict, indent=4))
-
-        raise requests.HTTPError()
+        _raise_error(response)
+
+
+def _raise_error(response: requests.Response) -> None:
+    """Logs a failed response, with its full body, and raises."""
+
+    if len(response.content) == 0:
+        response_data = ''
+    else:
+        try:
+            response_data = decoding.decode(response.content)
+        except:
+            response_data = {'content': response.text}
+
+    # Define the error dict.
+    error_dict = {'error_code': response.status_code,
+                  'response_url': response.url,
+                  'response_body': response_data,
+                  'response_request': dict(response.request.headers),
+                  'response_method': response.request.method,
+                  }
+
+    # Log the error, with the full body.
+    logging.error('Request failed: %s', log.Body(error_dict, limit=None))
+
+    # The message carries the status, the request and the start of the redacted body.
+    message = f'{response.status_code} {response.request.method} {response.url}'
+    if response_data:
+        message += f': {log.Body(response_data, limit=200)}'
+
+    raise requests.HTTPError(message, response=response)
+
+
+def stream_request(method: str, endpoint: str, params: dict = None, json_payload: dict = None,
+                   path: str = None, chunk_size: int = 65536) -> Iterator[Any]:
+    """Makes a request and yields the items of a JSON array in its response as they arrive.
+
+    ### Overview
+    ---
+    Meant for the largest responses such as history, positions and security
+    definitions. The body is read in chunks and only one item of the array is
+    decoded and held in memory at a time, which keeps the peak memory flat
+    whatever the size of the response. Unlike `make_request` this is a plain
+    function, the items are consumed in the calling process.
+
+    ### Parameters
+    ----
+    method : str
+        The Request method, can be one of the following:
+        ['get','post','put','delete','patch']
+
+    endpoint : str
+        The API URL endpoint, example is '/api/iserver/marketdata/history'
+
+    params : dict (optional, Default={})
+        The URL params for the request.
+
+    json_payload : dict (optional, Default={})
+        A json data payload for a request
+
+    path : str (optional, Default=None)
+        The dotted keys leading to the array in the response, example
+        is 'data'. Defaults to the response being the array.
+
+    chunk_size : int (optional, Default=65536)
+        The number of bytes read from the connection at once.
+
+    ### Returns
+    ----
+    Iterator[Any]:
+        The decoded items of the array.
+    """
+
+    # Build the URL.
+    url = RESOURCE_URL + endpoint
+    headers = {"Content-Type": "application/json",
+               "User-Agent": UserAgent().ff}
+
+    logging.debug('Streaming request: %s %s, params: %s, payload: %s', method, url, params,
+                  log.Body(json_payload, limit=None))
+
+    template = metrics.endpoint_template(endpoint)
+    limits = limiter.adaptive
+    if limits is not None:
+        limits.acquire(template)
+
+    # The span is not made current, the items are consumed by the caller between two yields.
+    with tracing.request_span(method, template, current=False) as span:
+        start = time.perf_counter()
+        response = None
+        try:
+            if gateways.pool is not None:
+                response = gateways.pool.request(method.upper(), endpoint,
+                                                 account_id=gateways.account_of(endpoint, params, json_payload),
+                                                 contract_id=gateways.contract_of(endpoint, params),
+                                                 params=params, json=json_payload, headers=headers, stream=True)
+            else:
+                response = requests.request(method=method.upper(), url=url, params=params, json=json_payload,
+                                            verify=False, headers=headers, stream=True)
+        except requests.RequestException:
+            metrics.sink.observe_request(method, template, 0, time.perf_counter() - start, 0, 0)
+            if limits is not None:
+                limits.release(template, 0, time.perf_counter() - start)
+            raise
+
+        # The limiter is fed the time to the response headers, the body takes as long as its size.
+        first_byte = time.perf_counter() - start
+        bytes_out = len(response.request.body or b'')
+        if span is not None:
+            span.set_attribute('http.status_code', response.status_code)
+
+        # Capture needs the whole body, which is only kept when capture is on.
+        captured = [] if capture.recorder is not None else None
+
+        try:
+            with response:
+                if not response.ok:
+                    metrics.sink.observe_request(method, template, response.status_code,
+                                                 time.perf_counter() - start, bytes_out, len(response.content))
+                    if captured is not None:
+                        captured.append(response.content)
+                    _raise_error(response)
+
+                received = 0
+
+                def _chunks():
+                    nonlocal received
+                    for chunk in response.iter_content(chunk_size=chunk_size):
+                        received += len(chunk)
+                        if captured is not None:
+                            captured.append(chunk)
+                        yield chunk
+
+                try:
+                    yield from decoding.iter_array(_chunks(), path=path)
+                finally:
+                    metrics.sink.observe_request(method, template, response.status_code,
+                                                 time.perf_counter() - start, bytes_out, received)
+        finally:
+            if limits is not None:
+                limits.release(template, response.status_code, first_byte)
+            if captured is not None and capture.recorder is not None:
+                capture.recorder.record(method, endpoint, params, json_payload, response.status_code,
+                                        time.perf_counter() - start, b''.join(captured))
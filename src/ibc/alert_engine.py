@@ -0,0 +1,210 @@
+import math
+import bisect
+import itertools
+import threading
+
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Union
+from enum import Enum
+
+from ibc.fields import to_float
+
+
+# The snapshot fields alerts are usually set on: last price, volume and change %.
+ALERT_FIELDS = ('31', '87', '83')
+
+ABOVE = '>='
+BELOW = '<='
+
+
+class PriceAlert:
+    """A condition on one field of one contract and the action it triggers."""
+
+    __slots__ = ('alert_id', 'contract_id', 'field', 'operator', 'threshold', 'action', 'once')
+
+    def __init__(self, alert_id: int, contract_id: int, field: str, operator: str, threshold: float,
+                 action: Any, once: bool) -> None:
+        self.alert_id = alert_id
+        self.contract_id = contract_id
+        self.field = field
+        self.operator = operator
+        self.threshold = threshold
+        self.action = action
+        self.once = once
+
+    def to_dict(self) -> dict:
+        return {
+            'alert_id': self.alert_id,
+            'conid': self.contract_id,
+            'field': self.field,
+            'operator': self.operator,
+            'threshold': self.threshold
+        }
+
+
+class _Book:
+    """The sorted thresholds of one (conid, field) pair, one side per operator."""
+
+    __slots__ = ('above', 'above_ids', 'below', 'below_ids', 'last')
+
+    def __init__(self) -> None:
+        self.above = []
+        self.above_ids = []
+        self.below = []
+        self.below_ids = []
+        self.last = None
+
+
+class AlertEngine:
+    """Evaluates price, volume and change % alerts locally against ticks.
+
+    Thresholds are kept sorted per (conid, field) and side, so a tick finds
+    the alerts it crossed with two binary searches, O(log n) no matter how
+    many alerts are set. An alert triggers when the value crosses its
+    threshold, or as soon as its condition is known to hold: when added, if
+    the last value seen for its contract and field already meets it, or else
+    on the first tick. Values are only kept for the fields with alerts.
+    One-shot alerts are removed once triggered, the others trigger again on
+    the next crossing.
+
+    Actions are either callables, called with the alert and the value, or
+    Celery signatures, sent with the alert as a dictionary and the value.
+
+    ### Usage
+    ----
+        >>> engine = AlertEngine()
+        >>> engine.add(265598, MarketDataFields.LastPrice, '>=', 150.0, print)
+        >>> engine.add(265598, '83', '<=', -5.0, send_email.s())
+        >>> engine.on_tick(265598, {'31': '150.25', '83': '-1.2%'})
+    """
+
+    def __init__(self) -> None:
+        self._books: Dict[tuple, _Book] = {}
+        self._alerts: Dict[int, PriceAlert] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._alerts)
+
+    def add(self, contract_id: int, field: Union[str, Enum], operator: str, threshold: float,
+            action: Any, once: bool = True) -> int:
+        """Adds an alert.
+
+        Args:
+            contract_id (int): The contract Id.
+            field (Union[str, Enum]): The snapshot field, example is `MarketDataFields.LastPrice`.
+            operator (str): Either '>=' or '<='.
+            threshold (float): The value to cross.
+            action (Any): A callable taking the alert and the value, or a Celery signature.
+            once (bool, optional): Remove the alert once triggered. Defaults to True.
+
+        Returns:
+            int: The alert ID, used to remove it. A one-shot alert whose condition
+                 already holds on the last tick is triggered at once and not kept.
+        """
+        if operator not in (ABOVE, BELOW):
+            raise ValueError(f'The operator must be {ABOVE!r} or {BELOW!r}, not {operator!r}.')
+
+        field = field.value if isinstance(field, Enum) else str(field)
+
+        with self._lock:
+            alert = PriceAlert(next(self._ids), int(contract_id), field, operator, float(threshold), action, once)
+            book = self._books.setdefault((alert.contract_id, field), _Book())
+
+            # The ticks seen so far will not cross it again, check the last one now.
+            last = book.last
+            holds = last is not None and (last >= alert.threshold if operator == ABOVE else last <= alert.threshold)
+
+            if not (holds and once):
+                self._alerts[alert.alert_id] = alert
+                thresholds, ids = (book.above, book.above_ids) if operator == ABOVE else (book.below, book.below_ids)
+                index = bisect.bisect_right(thresholds, alert.threshold)
+                thresholds.insert(index, alert.threshold)
+                ids.insert(index, alert.alert_id)
+
+        if holds:
+            self._dispatch(alert, last)
+
+        return alert.alert_id
+
+    def remove(self, alert_id: int) -> bool:
+        """Removes an alert, returns False if it does not exist."""
+        with self._lock:
+            alert = self._alerts.pop(alert_id, None)
+            if alert is None:
+                return False
+
+            self._unindex(alert)
+            return True
+
+    def _unindex(self, alert: PriceAlert) -> None:
+        book = self._books[(alert.contract_id, alert.field)]
+        thresholds, ids = (book.above, book.above_ids) if alert.operator == ABOVE else (book.below, book.below_ids)
+
+        index = bisect.bisect_left(thresholds, alert.threshold)
+        while ids[index] != alert.alert_id:
+            index += 1
+
+        del thresholds[index]
+        del ids[index]
+
+    def alerts(self, contract_id: int = None) -> List[PriceAlert]:
+        """Returns the alerts set, optionally only those of one contract."""
+        with self._lock:
+            return [
+                alert for alert in self._alerts.values()
+                if contract_id is None or alert.contract_id == int(contract_id)
+            ]
+
+    def on_tick(self, contract_id: int, values: dict) -> List[PriceAlert]:
+        """Evaluates the alerts of a contract against a tick and runs the triggered actions.
+
+        Args:
+            contract_id (int): The contract Id.
+            values (dict): The snapshot fields of the tick, keyed by field ID.
+
+        Returns:
+            List[PriceAlert]: The triggered alerts.
+        """
+        contract_id = int(contract_id)
+        triggered = []
+
+        with self._lock:
+            for field, raw in values.items():
+                book = self._books.get((contract_id, field))
+                if book is None:
+                    continue
+
+                value = to_float(raw)
+                if math.isnan(value):
+                    continue
+
+                last, book.last = book.last, value
+
+                # Rising through a threshold: last < threshold <= value.
+                low = 0 if last is None else bisect.bisect_right(book.above, last)
+                high = bisect.bisect_right(book.above, value)
+                triggered.extend((self._alerts[alert_id], value) for alert_id in book.above_ids[low:high])
+
+                # Falling through a threshold: value <= threshold < last.
+                low = bisect.bisect_left(book.below, value)
+                high = len(book.below) if last is None else bisect.bisect_left(book.below, last)
+                triggered.extend((self._alerts[alert_id], value) for alert_id in book.below_ids[low:high])
+
+            for alert, _ in triggered:
+                if alert.once and self._alerts.pop(alert.alert_id, None) is not None:
+                    self._unindex(alert)
+
+        for alert, value in triggered:
+            self._dispatch(alert, value)
+
+        return [alert for alert, _ in triggered]
+
+    def _dispatch(self, alert: PriceAlert, value: float) -> None:
+        if hasattr(alert.action, 'apply_async'):
+            alert.action.apply_async(args=(alert.to_dict(), value))
+        else:
+            alert.action(alert, value)
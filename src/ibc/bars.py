@@ -0,0 +1,181 @@
+from typing import Dict
+from typing import List
+from typing import Union
+from datetime import datetime
+from datetime import timezone
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:
+    from backports.zoneinfo import ZoneInfo
+
+import numpy as np
+
+from ibc import BarTypes
+from ibc.tasks.market_data import market_history
+
+
+DAY_MS = 24 * 60 * 60 * 1000
+
+# The length of the intraday `BarTypes` in minutes.
+BAR_MINUTES = {
+    BarTypes.OneMinute: 1,
+    BarTypes.TwoMinute: 2,
+    BarTypes.ThreeMinute: 3,
+    BarTypes.FiveMinute: 5,
+    BarTypes.TenMinute: 10,
+    BarTypes.FifteenMinute: 15,
+    BarTypes.ThirtyMinute: 30,
+    BarTypes.OneHour: 60,
+    BarTypes.TwoHour: 120,
+    BarTypes.ThreeHour: 180,
+    BarTypes.FourHour: 240,
+    BarTypes.EightHour: 480
+}
+
+# The ordering of the `BarTypes` from the finest to the coarsest.
+BAR_ORDER = list(BAR_MINUTES) + [BarTypes.OneDay, BarTypes.OneWeek, BarTypes.OneMonth]
+
+
+def _minutes(clock: str) -> int:
+    hours, minutes = clock.split(':')
+    return int(hours) * 60 + int(minutes)
+
+
+def to_arrays(history: dict) -> Dict[str, np.ndarray]:
+    """Converts a `market_history` response to arrays sorted by time.
+
+    Args:
+        history (dict): A collection `Bar` resources.
+
+    Returns:
+        Dict[str, np.ndarray]: The 't' (epoch milliseconds), 'o', 'h', 'l', 'c' and 'v' columns.
+    """
+    data = history.get('data', [])
+    bars = {'t': np.array([bar['t'] for bar in data], dtype=np.int64)}
+    for column in ('o', 'h', 'l', 'c', 'v'):
+        bars[column] = np.array([bar.get(column, np.nan) for bar in data], dtype=float)
+
+    order = np.argsort(bars['t'], kind='stable')
+    return {column: values[order] for column, values in bars.items()}
+
+
+def _local_ms(times: np.ndarray, zone: ZoneInfo) -> np.ndarray:
+    # Offsets only change between days, so look them up once per day and not per bar.
+    days, inverse = np.unique(times // DAY_MS, return_inverse=True)
+    offsets = np.array([
+        zone.utcoffset(datetime.fromtimestamp(day * 86400 + 43200, tz=timezone.utc).replace(tzinfo=None))
+        .total_seconds() * 1000
+        for day in days.tolist()
+    ], dtype=np.int64)
+    return times + offsets[inverse.ravel()]
+
+
+def resample(bars: Dict[str, np.ndarray], bar: Union[str, BarTypes], time_zone: str = 'America/New_York',
+             session_open: str = '09:30', session_close: str = '16:00', rth_only: bool = False) -> Dict[str, np.ndarray]:
+    """Aggregates finer bars into coarser ones.
+
+    Intraday buckets are anchored at the session open of every day, so a
+    one hour bar covers 09:30 to 10:30 and no bucket spans two days or the
+    session open. Daily, weekly and monthly buckets follow the calendar of
+    `time_zone`, weeks start on Monday.
+
+    Args:
+        bars (Dict[str, np.ndarray]): The bars to aggregate, see `to_arrays`.
+        bar (Union[str, BarTypes]): The bar type to build.
+        time_zone (str, optional): The time zone of the exchange. Defaults to 'America/New_York'.
+        session_open (str, optional): The regular session open as 'HH:MM'. Defaults to '09:30'.
+        session_close (str, optional): The regular session close as 'HH:MM'. Defaults to '16:00'.
+        rth_only (bool, optional): Drop the bars outside the regular session. Defaults to False.
+
+    Returns:
+        Dict[str, np.ndarray]: The aggregated bars. For intraday bars 't' is the start of
+                               the bucket, otherwise the time of its first bar.
+    """
+    bar = BarTypes(bar)
+    local = _local_ms(bars['t'], ZoneInfo(time_zone))
+    local_days = local // DAY_MS
+    minutes = (local % DAY_MS) // 60000
+    open_minutes = _minutes(session_open)
+
+    mask = np.ones(len(local), dtype=bool)
+    if rth_only:
+        mask = (minutes >= open_minutes) & (minutes < _minutes(session_close))
+
+    if bar in BAR_MINUTES:
+        size = BAR_MINUTES[bar]
+        slots = np.floor_divide(minutes - open_minutes, size)
+        keys = local_days * (DAY_MS // 60000) + slots
+        starts_ms = bars['t'] - (local - (local_days * DAY_MS + (open_minutes + slots * size) * 60000))
+    elif bar is BarTypes.OneDay:
+        keys = local_days
+    elif bar is BarTypes.OneWeek:
+        # The epoch started on a Thursday.
+        keys = (local_days + 3) // 7
+    else:
+        keys = local_days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+
+    keys = keys[mask]
+    columns = {column: values[mask] for column, values in bars.items()}
+    if not len(keys):
+        return {column: values[:0] for column, values in columns.items()}
+
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(keys)) + 1))
+    ends = np.append(starts[1:], len(keys)) - 1
+
+    return {
+        't': (starts_ms[mask] if bar in BAR_MINUTES else columns['t'])[starts],
+        'o': columns['o'][starts],
+        'h': np.maximum.reduceat(columns['h'], starts),
+        'l': np.minimum.reduceat(columns['l'], starts),
+        'c': columns['c'][ends],
+        'v': np.add.reduceat(columns['v'], starts)
+    }
+
+
+def multi_bars(contract_id: str, period: str, bars: List[Union[str, BarTypes]], exchange: str = None,
+               outside_regular_trading_hours: bool = True, **session) -> Dict[BarTypes, Dict[str, np.ndarray]]:
+    """Fetches the finest of `bars` once and builds every other bar type from it.
+
+    The history endpoint caps the number of points per request, so the
+    `period` is limited by the finest bar requested.
+
+    Args:
+        contract_id (str): A contract Id.
+        period (str): Available time period: {1-30}min, {1-8}h, {1-1000}d, {1-792}w, {1-182}m, {1-15}y
+        bars (List[Union[str, BarTypes]]): The bar types wanted.
+        exchange (str, optional): Exchange of the conid. Defaults to None.
+        outside_regular_trading_hours (bool, optional): Include the bars outside of regular trading hours.
+                                                        Defaults to True.
+        **session: The session arguments of `resample`.
+
+    Returns:
+        Dict[BarTypes, Dict[str, np.ndarray]]: The bars of every requested type.
+
+    Usage:
+        >>> multi_bars(
+            contract_id='265598',
+            period='5d',
+            bars=[BarTypes.OneMinute, BarTypes.FiveMinute, BarTypes.OneHour, BarTypes.OneDay]
+        )
+    """
+    bars = sorted({BarTypes(bar) for bar in bars}, key=BAR_ORDER.index)
+    finest = bars[0]
+
+    for bar in bars[1:]:
+        if bar in BAR_MINUTES and BAR_MINUTES[bar] % BAR_MINUTES[finest]:
+            raise ValueError(f'{bar.value} bars can not be built from {finest.value} bars.')
+
+    history = to_arrays(market_history(
+        contract_id=contract_id,
+        period=period,
+        bar=finest,
+        exchange=exchange,
+        outside_regular_trading_hours=outside_regular_trading_hours
+    ))
+
+    resampled = {finest: history}
+    for bar in bars[1:]:
+        resampled[bar] = resample(history, bar, rth_only=not outside_regular_trading_hours, **session)
+
+    return resampled
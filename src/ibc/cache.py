@@ -0,0 +1,210 @@
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+from datetime import datetime
+from datetime import timedelta
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from collections import OrderedDict
+
+
+def hash_key(obj: Any) -> str:
+    """Returns a stable hash of a JSON serializable object.
+
+    Dictionaries hash the same regardless of key order, so two
+    equal definitions always map to the same cache entry.
+
+    Args:
+        obj (Any): The object to hash, example is a scanner definition.
+
+    Returns:
+        str: The hex digest.
+    """
+    return hashlib.sha1(json.dumps(obj, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+class TTLCache:
+    """A thread safe in-memory cache whose entries expire.
+
+    The cache keeps at most `maxsize` entries and drops the least
+    recently used one when full.
+
+    ### Usage
+    ----
+        >>> cache = TTLCache(ttl=30)
+        >>> cache.get_or_set('key', lambda: make_request(method='get', endpoint='/api/iserver/scanner/params'))
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 1024) -> None:
+        """Initializes the `TTLCache`.
+
+        Args:
+            ttl (float): The default lifetime of an entry in seconds.
+            maxsize (int, optional): The maximum number of entries. Defaults to 1024.
+        """
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        """Returns the value stored under `key`, or `default` if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+
+            expires, value = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return default
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Any, value: Any, ttl: float = None) -> None:
+        """Stores `value` under `key` for `ttl` seconds, defaults to the cache ttl."""
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_set(self, key: Any, factory: Callable[[], Any], ttl: float = None) -> Any:
+        """Returns the cached value, calling `factory` to fill the entry on a miss.
+
+        Args:
+            key (Any): The cache key.
+            factory (Callable[[], Any]): Builds the value, called without holding the lock.
+            ttl (float, optional): The lifetime of a new entry. Defaults to the cache ttl.
+
+        Returns:
+            Any: The cached or newly built value.
+        """
+        missing = object()
+        value = self.get(key, missing)
+
+        if value is missing:
+            value = factory()
+            self.set(key, value, ttl=ttl)
+
+        return value
+
+    def pop(self, key: Any, default: Any = None) -> Any:
+        """Removes `key` and returns its value, or `default` if missing."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+
+        return default if entry is None else entry[1]
+
+    def clear(self) -> None:
+        """Removes every entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DiskCache:
+    """A persistent cache in a SQLite file, shared by every process using the file.
+
+    Values are stored as JSON with an absolute expiry time, so a process
+    started tomorrow knows what it can still reuse.
+
+    ### Usage
+    ----
+        >>> cache = DiskCache('data/cache.sqlite', namespace='fundamentals')
+        >>> cache.set_many({'265598': summary}, expires_at=next_midnight())
+        >>> cache.get_many(['265598'])
+        >>> cache.close()
+    """
+
+    def __init__(self, path: str, namespace: str = 'default') -> None:
+        """Initializes the `DiskCache`.
+
+        Args:
+            path (str): The SQLite file, created if missing.
+            namespace (str, optional): Separates unrelated entries stored in the same file.
+                                       Defaults to 'default'.
+        """
+        self.path = path
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, timeout=30)
+
+        with self._lock, self._connection:
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS cache ('
+                'namespace TEXT, key TEXT, value TEXT, expires_at REAL, PRIMARY KEY (namespace, key))'
+            )
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Returns the entries of `keys` that exist and have not expired.
+
+        Args:
+            keys (Iterable[str]): The keys to look up.
+
+        Returns:
+            Dict[str, Any]: The fresh entries by key.
+        """
+        keys = [str(key) for key in keys]
+        found = {}
+
+        with self._lock:
+            # Stay below the SQLite limit on the number of query parameters.
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                rows = self._connection.execute(
+                    f'SELECT key, value FROM cache WHERE namespace = ? AND expires_at > ? '
+                    f'AND key IN ({",".join("?" * len(batch))})',
+                    [self.namespace, time.time()] + batch
+                )
+                found.update((key, json.loads(value)) for key, value in rows)
+
+        return found
+
+    def set_many(self, items: Dict[str, Any], expires_at: float) -> None:
+        """Stores the entries until `expires_at`.
+
+        Args:
+            items (Dict[str, Any]): The JSON serializable values by key.
+            expires_at (float): The epoch time the entries expire at.
+        """
+        with self._lock, self._connection:
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)',
+                [(self.namespace, str(key), json.dumps(value), expires_at) for key, value in items.items()]
+            )
+
+    def purge(self) -> None:
+        """Deletes the expired entries of the namespace."""
+        with self._lock, self._connection:
+            self._connection.execute(
+                'DELETE FROM cache WHERE namespace = ? AND expires_at <= ?', (self.namespace, time.time())
+            )
+
+    def close(self) -> None:
+        """Closes the SQLite connection."""
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self) -> 'DiskCache':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+def next_midnight(now: float = None) -> float:
+    """Returns the epoch time of the next local midnight, the expiry of daily entries."""
+    today = datetime.fromtimestamp(time.time() if now is None else now).date()
+    return datetime.combine(today + timedelta(days=1), datetime.min.time()).timestamp()
@@ -0,0 +1,240 @@
+import json
+import time
+import logging
+import threading
+
+from typing import Callable
+from typing import Dict
+from typing import List
+from urllib.parse import parse_qsl
+from urllib.parse import urlsplit
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from concurrent.futures import ThreadPoolExecutor
+
+from . import log
+from . import decoding
+from . import metrics
+
+
+class TrafficRecorder:
+    """Writes every gateway request with its response and timing to a JSON lines file.
+
+    Values of sensitive keys are redacted with `log.redact` before being
+    written, the file holds no credentials or session cookies.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = open(path, mode='a')
+        self._lock = threading.Lock()
+
+    def record(self, method: str, endpoint: str, params: dict, json_payload: dict,
+               status_code: int, seconds: float, content: bytes) -> None:
+        """Appends one request and its response."""
+        try:
+            body = decoding.decode(content) if content else None
+        except ValueError:
+            body = content.decode('utf-8', errors='replace')
+
+        line = json.dumps({
+            'time': time.time() - seconds,
+            'seconds': seconds,
+            'method': method,
+            'endpoint': endpoint,
+            'template': metrics.endpoint_template(endpoint),
+            'params': log.redact(params),
+            'json_payload': log.redact(json_payload),
+            'status_code': status_code,
+            'response': log.redact(body)
+        }, default=str)
+
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+# The recorder `make_request` writes to, `None` when capture is off.
+recorder: TrafficRecorder = None
+
+
+def start_capture(path: str) -> TrafficRecorder:
+    """Starts recording every request of this process to `path`.
+
+    ### Usage
+    ----
+        >>> from ibc import capture
+        >>> capture.start_capture('traffic.jsonl')
+    """
+    global recorder
+    stop_capture()
+    recorder = TrafficRecorder(path)
+    return recorder
+
+
+def stop_capture() -> None:
+    """Stops recording."""
+    global recorder
+    if recorder is not None:
+        recorder.close()
+        recorder = None
+
+
+def load(path: str) -> List[dict]:
+    """Returns the recorded requests of a capture file in time order."""
+    with open(path) as capture_file:
+        records = [json.loads(line) for line in capture_file if line.strip()]
+    return sorted(records, key=lambda record: record['time'])
+
+
+def _key(method: str, endpoint: str, params: dict) -> tuple:
+    params = sorted((str(key), str(value)) for key, value in (params or {}).items() if value is not None)
+    return method.upper(), endpoint, tuple(params)
+
+
+class StandInGateway:
+    """A local HTTP server answering with the responses of a capture file.
+
+    A request is matched on its method, path and query first, then on its
+    endpoint template, so requests about other contracts or accounts still
+    get an answer of the right shape. Matching responses are served in turn.
+    With `latency` the recorded response time is reproduced too.
+
+    ### Usage
+    ----
+        >>> gateway = StandInGateway(capture.load('traffic.jsonl'), port=5001)
+        >>> gateway.start()
+        >>> gateways.configure([gateways.Gateway(gateway.url)])
+    """
+
+    def __init__(self, records: List[dict], host: str = '127.0.0.1', port: int = 0, latency: bool = True) -> None:
+        """Initializes the `StandInGateway`.
+
+        Args:
+            records (List[dict]): The recorded requests, see `load`.
+            host (str, optional): The address to listen on. Defaults to '127.0.0.1'.
+            port (int, optional): The port to listen on. Defaults to a free one.
+            latency (bool, optional): Wait the recorded response time before answering. Defaults to True.
+        """
+        self.latency = latency
+        self._exact: Dict[tuple, List[dict]] = {}
+        self._templates: Dict[tuple, List[dict]] = {}
+        self._turns: Dict[tuple, int] = {}
+        self._lock = threading.Lock()
+
+        for record in records:
+            self._exact.setdefault(_key(record['method'], record['endpoint'], record['params']), []).append(record)
+            self._templates.setdefault((record['method'].upper(), record['template']), []).append(record)
+
+        stand_in = self
+
+        class _Handler(BaseHTTPRequestHandler):
+
+            def _answer(self):
+                url = urlsplit(self.path)
+                record = stand_in.match(self.command, url.path, dict(parse_qsl(url.query)))
+                if record is None:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+
+                if stand_in.latency:
+                    time.sleep(record['seconds'])
+
+                body = b'' if record['response'] is None else json.dumps(record['response']).encode('utf-8')
+                self.send_response(record['status_code'])
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = do_DELETE = do_PUT = _answer
+
+            def log_message(self, format, *args):
+                logging.debug('Stand-in gateway: ' + format, *args)
+
+        self.server = ThreadingHTTPServer((host, port), _Handler)
+        self.url = f'http://{self.server.server_address[0]}:{self.server.server_address[1]}'
+
+    def match(self, method: str, endpoint: str, params: dict) -> dict:
+        """Returns the next recorded response for a request, or `None` if nothing matches."""
+        for key, index in ((_key(method, endpoint, params), self._exact),
+                           ((method.upper(), metrics.endpoint_template(endpoint)), self._templates)):
+            candidates = index.get(key)
+            if candidates:
+                with self._lock:
+                    turn = self._turns.get(key, 0)
+                    self._turns[key] = turn + 1
+                return candidates[turn % len(candidates)]
+        return None
+
+    def start(self) -> threading.Thread:
+        """Serves in a daemon thread."""
+        thread = threading.Thread(target=self.server.serve_forever, name='ibc-stand-in-gateway', daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def replay(records: List[dict], speed: float = 1.0, send: Callable[[dict], None] = None,
+           max_workers: int = 32) -> dict:
+    """Sends the recorded requests again, keeping their spacing scaled by `speed`.
+
+    Args:
+        records (List[dict]): The recorded requests, see `load`.
+        speed (float, optional): The pace relative to the recording, example is 10.0 for
+                                 ten times faster. Defaults to 1.0.
+        send (Callable[[dict], None], optional): Sends one record. Defaults to publishing a
+                                                 `make_request` task, which load tests the
+                                                 broker and the workers.
+        max_workers (int, optional): The maximum number of sends in flight. Defaults to 32.
+
+    Returns:
+        dict: The number of requests sent and failed, and how late the sends ran
+              behind the schedule at most, in seconds.
+    """
+    if send is None:
+        from ibc import make_request
+
+        def send(record):
+            make_request.delay(method=record['method'], endpoint=record['endpoint'],
+                               params=record['params'], json_payload=record['json_payload'])
+
+    stats = {'sent': 0, 'failed': 0, 'max_lag': 0.0}
+    lock = threading.Lock()
+
+    def _send(record):
+        try:
+            send(record)
+            failed = 0
+        except Exception:
+            logging.exception('Replaying %s %s failed.', record['method'], record['endpoint'])
+            failed = 1
+
+        with lock:
+            stats['sent'] += 1
+            stats['failed'] += failed
+
+    if not records:
+        return stats
+
+    first = records[0]['time']
+    began = time.monotonic()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for record in records:
+            delay = (record['time'] - first) / speed - (time.monotonic() - began)
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                stats['max_lag'] = max(stats['max_lag'], -delay)
+            executor.submit(_send, record)
+
+    return stats
@@ -6,7 +6,8 @@ app = Celery('ibc',
              broker='pyamqp://guest@rabbitmq//',
              include=['ibc.session',
                       'ibc.tasks.accounts',
-                      'ibc.tasks.portfolio'])
+                      'ibc.tasks.portfolio',
+                      'ibc.tasks.batch'])
 
 # prevent the task logger from showing task results
 trace.LOG_SUCCESS = """\
@@ -0,0 +1,131 @@
+import re
+import json
+import codecs
+
+from typing import Any
+from typing import Callable
+from typing import Iterable
+from typing import Iterator
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_DELIMITER = re.compile(r'[,\]}\s]')
+_DECODER = json.JSONDecoder()
+_NUMBER_START = frozenset('-0123456789')
+
+# The function turning a response body into Python objects, `orjson.loads` when installed.
+decode: Callable[[bytes], Any] = orjson.loads if orjson is not None else json.loads
+
+
+def set_decoder(decoder: Callable[[bytes], Any]) -> None:
+    """Replaces the function used to decode response bodies.
+
+    Args:
+        decoder (Callable[[bytes], Any]): Takes the raw body and returns the decoded value.
+
+    Usage:
+        >>> import orjson
+        >>> from ibc import decoding
+        >>> decoding.set_decoder(orjson.loads)
+    """
+    global decode
+    decode = decoder
+
+
+class _Reader:
+    """A window over a stream of JSON text, refilled as it is consumed."""
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self.chunks = iter(chunks)
+        self.text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = ''
+        self.pos = 0
+
+    def fill(self) -> bool:
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            return False
+
+        self.buffer = self.buffer[self.pos:] + self.text_decoder.decode(chunk)
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                raise ValueError('Unexpected end of the JSON stream.')
+
+    def expect(self, character: str) -> None:
+        if self.peek() != character:
+            raise ValueError(f'Expected {character!r} at {self.buffer[self.pos:self.pos + 20]!r}.')
+        self.pos += 1
+
+    def value(self) -> Any:
+        # A number is only complete once the character after it arrived.
+        if self.peek() in _NUMBER_START:
+            while _DELIMITER.search(self.buffer, self.pos) is None and self.fill():
+                pass
+
+        while True:
+            try:
+                obj, self.pos = _DECODER.raw_decode(self.buffer, self.pos)
+                return obj
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+
+
+def iter_array(chunks: Iterable[bytes], path: str = None) -> Iterator[Any]:
+    """Yields the items of a JSON array as the body arrives.
+
+    Only one item is held in memory at a time, the rest of the document
+    is parsed to find the array and then discarded.
+
+    Args:
+        chunks (Iterable[bytes]): The body, example is `response.iter_content(65536)`.
+        path (str, optional): The dotted keys leading to the array, example is 'data'.
+                              Defaults to the document being the array.
+
+    Yields:
+        Any: The decoded items of the array.
+    """
+    reader = _Reader(chunks)
+
+    for key in path.split('.') if path else []:
+        reader.expect('{')
+        while True:
+            if reader.peek() == '}':
+                return
+
+            name = reader.value()
+            reader.expect(':')
+            if name == key:
+                break
+
+            reader.value()
+            if reader.peek() == ',':
+                reader.pos += 1
+
+    reader.expect('[')
+    if reader.peek() == ']':
+        return
+
+    while True:
+        yield reader.value()
+
+        # Compact bodies have the comma right after the item, skip the whitespace scan then.
+        if reader.pos < len(reader.buffer) and reader.buffer[reader.pos] == ',':
+            reader.pos += 1
+        elif reader.peek() == ',':
+            reader.pos += 1
+        else:
+            reader.expect(']')
+            return
@@ -0,0 +1,82 @@
+import asyncio
+import functools
+
+from typing import Any
+from typing import Callable
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+
+from celery.canvas import Signature
+
+
+def run_task(task: Callable, *args, **kwargs) -> Any:
+    """Runs a task in the current thread and returns its result.
+
+    The function body is called without the Celery task machinery. Tasks
+    returning a chain, like the `ibc.tasks.portfolio` ones, have their
+    chain applied locally as well, so no broker or result backend is used.
+
+    Args:
+        task (Callable): A Celery task or a plain function.
+
+    Returns:
+        Any: The result of the task.
+    """
+    result = getattr(task, 'run', task)(*args, **kwargs)
+
+    if isinstance(result, Signature):
+        result = result.apply().get()
+
+    return result
+
+
+class DirectClient:
+    """Runs the tasks in-process on a thread pool instead of through the broker.
+
+    Use it for latency sensitive calls, like placing orders or checking a
+    quote, the queue adds two network hops to a call that wraps a single
+    request. Batch work keeps using `.delay()`.
+
+    ### Usage
+    ----
+        >>> client = DirectClient()
+        >>> future = client.submit(snapshot, contract_ids=['265598'], fields=FieldProfiles.Quote)
+        >>> future.result()
+        >>> place = client.wrap(place_order)
+        >>> place(account_id='U1234567', orders=[...]).result()
+        >>> await client.run(snapshot, contract_ids=['265598'])
+    """
+
+    def __init__(self, max_workers: int = 16) -> None:
+        """Initializes the `DirectClient`.
+
+        Args:
+            max_workers (int, optional): The maximum number of requests in flight. Defaults to 16.
+        """
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ibc-direct')
+
+    def submit(self, task: Callable, *args, **kwargs) -> Future:
+        """Schedules a task with the same arguments as its `.delay()` and returns a future."""
+        return self._executor.submit(run_task, task, *args, **kwargs)
+
+    def wrap(self, task: Callable) -> Callable[..., Future]:
+        """Returns a function with the signature of `task` returning futures."""
+        @functools.wraps(getattr(task, 'run', task))
+        def _submit(*args, **kwargs):
+            return self.submit(task, *args, **kwargs)
+
+        return _submit
+
+    def run(self, task: Callable, *args, **kwargs) -> 'asyncio.Future':
+        """Schedules a task and returns an awaitable for the running event loop."""
+        return asyncio.wrap_future(self.submit(task, *args, **kwargs))
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stops the thread pool once the scheduled tasks are done."""
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self) -> 'DirectClient':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.shutdown()
@@ -0,0 +1,158 @@
+import os
+import json
+import time
+import logging
+import threading
+
+from datetime import date
+from datetime import timedelta
+from typing import Callable
+from typing import List
+from typing import Union
+from enum import Enum
+from concurrent.futures import ThreadPoolExecutor
+
+from ibc.tasks.market_data import stream_history
+
+
+# The gateway serves only a handful of history requests at once.
+HISTORY_CONCURRENCY = 5
+
+
+class Progress:
+    """The progress of a `HistoryDownloader` run."""
+
+    def __init__(self, total: int, skipped: int) -> None:
+        self.total = total
+        self.skipped = skipped
+        self.done = 0
+        self.failed = 0
+        self.bars = 0
+        self.started = time.monotonic()
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    @property
+    def bars_per_second(self) -> float:
+        return self.bars / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self) -> str:
+        return (f'{self.done + self.skipped}/{self.total} windows ({self.failed} failed, {self.skipped} resumed), '
+                f'{self.bars} bars at {self.bars_per_second:.0f} bars/s')
+
+
+class HistoryDownloader:
+    """Downloads the history of many contracts over a date range to disk.
+
+    The range is split into windows of `window_days` and every (contract,
+    window) pair is one history request. At most `concurrency` requests
+    run at once. Every window is streamed to `{root}/{conid}/{YYYYMMDD}.jsonl`,
+    one bar per line as it is received, through a temporary file renamed
+    once complete, so the files on disk are the checkpoint: an interrupted
+    run started again skips the windows already downloaded.
+
+    ### Usage
+    ----
+        >>> downloader = HistoryDownloader(root='data/history', bar=BarTypes.FiveMinute)
+        >>> downloader.run(contract_ids=['265598', '8314'], start=date(2021, 1, 1), end=date(2021, 3, 31))
+    """
+
+    def __init__(self, root: str, bar: Union[str, Enum] = '1d', window_days: int = 30,
+                 concurrency: int = HISTORY_CONCURRENCY, outside_regular_trading_hours: bool = True,
+                 on_progress: Callable[[Progress], None] = None) -> None:
+        """Initializes the `HistoryDownloader`.
+
+        Args:
+            root (str): The directory the bars are written to.
+            bar (Union[str, Enum], optional): The bar type to download. Defaults to '1d'.
+            window_days (int, optional): The number of days per request, keep it small enough
+                                         for the gateway point limit of the bar type. Defaults to 30.
+            concurrency (int, optional): The maximum number of requests in flight.
+                                         Defaults to `HISTORY_CONCURRENCY`.
+            outside_regular_trading_hours (bool, optional): Include the bars outside of regular trading
+                                                            hours. Defaults to True.
+            on_progress (Callable[[Progress], None], optional): Called after every window. Defaults to
+                                                                logging the progress.
+        """
+        self.root = root
+        self.bar = bar.value if isinstance(bar, Enum) else bar
+        self.window_days = window_days
+        self.concurrency = concurrency
+        self.outside_regular_trading_hours = outside_regular_trading_hours
+        self.on_progress = on_progress or (lambda progress: logging.info('History download: %s', progress))
+        self._lock = threading.Lock()
+
+    def windows(self, start: date, end: date) -> List[date]:
+        """Returns the last day of every window covering `start` to `end`, inclusive."""
+        last_days = []
+        window_end = end
+        while window_end >= start:
+            last_days.append(window_end)
+            window_end -= timedelta(days=self.window_days)
+        return last_days
+
+    def _path(self, contract_id: str, window_end: date) -> str:
+        return os.path.join(self.root, str(contract_id), f'{window_end:%Y%m%d}.jsonl')
+
+    def _download(self, contract_id: str, window_end: date, start: date) -> int:
+        days = min(self.window_days, (window_end - start).days + 1)
+        bars = stream_history(
+            contract_id=contract_id,
+            period=f'{days}d',
+            bar=self.bar,
+            outside_regular_trading_hours=self.outside_regular_trading_hours,
+            start_time=f'{window_end:%Y%m%d}-23:59:59'
+        )
+
+        path = self._path(contract_id, window_end)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        count = 0
+        with open(path + '.tmp', mode='w') as window_file:
+            for bar in bars:
+                window_file.write(json.dumps(bar) + '\n')
+                count += 1
+        os.replace(path + '.tmp', path)
+
+        return count
+
+    def run(self, contract_ids: List[str], start: date, end: date) -> Progress:
+        """Downloads every window that is not on disk yet.
+
+        Args:
+            contract_ids (List[str]): The universe of contracts.
+            start (date): The first day of the range.
+            end (date): The last day of the range.
+
+        Returns:
+            Progress: The final progress, windows that failed are retried by the next run.
+        """
+        jobs = [
+            (contract_id, window_end)
+            for contract_id in contract_ids
+            for window_end in self.windows(start, end)
+        ]
+        pending = [job for job in jobs if not os.path.exists(self._path(*job))]
+        progress = Progress(total=len(jobs), skipped=len(jobs) - len(pending))
+
+        def _job(job):
+            try:
+                bars = self._download(job[0], job[1], start)
+            except Exception:
+                logging.exception('History download of %s until %s failed.', job[0], job[1])
+                bars = None
+
+            with self._lock:
+                if bars is None:
+                    progress.failed += 1
+                else:
+                    progress.done += 1
+                    progress.bars += bars
+                self.on_progress(progress)
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            list(executor.map(_job, pending))
+
+        return progress
@@ -0,0 +1,39 @@
+import math
+
+from typing import Any
+
+
+_SUFFIXES = {'K': 1e3, 'M': 1e6, 'B': 1e9}
+
+
+def to_float(value: Any) -> float:
+    """Converts a snapshot field value to a float.
+
+    Snapshot values are formatted strings: prices can carry a 'C'
+    (previous close) or 'H' (halted) prefix, sizes use thousands
+    separators and 'K', 'M' or 'B' suffixes and percentages end in '%'.
+
+    Args:
+        value (Any): The raw field value.
+
+    Returns:
+        float: The value, `nan` if it is missing or not numeric.
+    """
+    if value is None:
+        return math.nan
+
+    if isinstance(value, (int, float)):
+        return float(value)
+
+    text = str(value).strip().replace(',', '').rstrip('%')
+    if text[:1] in ('C', 'H'):
+        text = text[1:]
+
+    scale = _SUFFIXES.get(text[-1:].upper(), 1.0)
+    if scale != 1.0:
+        text = text[:-1]
+
+    try:
+        return float(text) * scale
+    except ValueError:
+        return math.nan
@@ -0,0 +1,93 @@
+import logging
+
+from typing import Any
+from typing import Dict
+from typing import List
+from concurrent.futures import ThreadPoolExecutor
+
+from ibc.cache import DiskCache
+from ibc.cache import next_midnight
+from ibc.tasks.data import summary
+
+
+class FundamentalsTable:
+    """The fundamentals summaries of many contracts, indexed by conid.
+
+    ### Usage
+    ----
+        >>> table = bulk_fundamentals(contract_ids, cache_path='data/cache.sqlite')
+        >>> table['265598']
+        >>> table.columns(['marketCap', 'peRatio'])
+    """
+
+    def __init__(self, summaries: Dict[str, dict]) -> None:
+        self.contract_ids = sorted(summaries)
+        self.index = {contract_id: row for row, contract_id in enumerate(self.contract_ids)}
+        self.rows = [summaries[contract_id] for contract_id in self.contract_ids]
+
+    def __getitem__(self, contract_id: str) -> dict:
+        return self.rows[self.index[str(contract_id)]]
+
+    def __contains__(self, contract_id: str) -> bool:
+        return str(contract_id) in self.index
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def columns(self, names: List[str]) -> Dict[str, List[Any]]:
+        """Returns the given keys of every summary as columns aligned with `contract_ids`.
+
+        Args:
+            names (List[str]): The keys of the summaries, missing values are `None`.
+
+        Returns:
+            Dict[str, List[Any]]: The columns, plus `conid`.
+        """
+        columns = {'conid': list(self.contract_ids)}
+        for name in names:
+            columns[name] = [row.get(name) if isinstance(row, dict) else None for row in self.rows]
+        return columns
+
+
+def bulk_fundamentals(contract_ids: List[str], cache_path: str, max_workers: int = 8,
+                      refresh: bool = False) -> FundamentalsTable:
+    """Returns the fundamentals of many contracts, fetching only the stale ones.
+
+    Summaries are cached on disk until the next local midnight, since the
+    data changes at most daily. The missing ones are fetched with at most
+    `max_workers` requests in flight, failures are logged and left out.
+
+    Args:
+        contract_ids (List[str]): The contracts to return.
+        cache_path (str): The SQLite file of the cache.
+        max_workers (int, optional): The maximum number of concurrent requests. Defaults to 8.
+        refresh (bool, optional): Ignore the cache and fetch everything. Defaults to False.
+
+    Returns:
+        FundamentalsTable: The summaries by conid.
+    """
+    contract_ids = list(dict.fromkeys(str(contract_id) for contract_id in contract_ids))
+
+    with DiskCache(cache_path, namespace='fundamentals') as cache:
+        summaries = {} if refresh else cache.get_many(contract_ids)
+        stale = [contract_id for contract_id in contract_ids if contract_id not in summaries]
+
+        def _fetch(contract_id):
+            try:
+                return contract_id, summary(contract_id=contract_id)
+            except Exception:
+                logging.exception('Fetching the fundamentals of %s failed.', contract_id)
+                return contract_id, None
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            fetched = {
+                contract_id: result
+                for contract_id, result in executor.map(_fetch, stale)
+                if result is not None
+            }
+
+        if fetched:
+            cache.set_many(fetched, expires_at=next_midnight())
+            summaries.update(fetched)
+
+    return FundamentalsTable(summaries)
@@ -0,0 +1,357 @@
+import re
+import time
+import zlib
+import logging
+import threading
+
+from typing import Dict
+from typing import List
+
+import requests
+
+from urllib3.exceptions import ConnectTimeoutError
+from urllib3.exceptions import NewConnectionError
+
+from . import metrics
+
+
+# The status codes of a gateway whose brokerage session dropped.
+SESSION_LOST = (401, 503)
+
+# The methods resent to the next gateway whatever the error, the others only
+# when the connection could not be opened.
+IDEMPOTENT = ('GET', 'HEAD', 'OPTIONS')
+
+# The calls a session needs before the account and market data endpoints
+# answer. They carry no account, so the pool sends them to every gateway.
+SESSION_SETUP = ('/api/iserver/accounts', '/api/portfolio/accounts', '/api/portfolio/subaccounts')
+
+# The endpoints whose subscriptions live in the session of a gateway.
+MARKET_DATA = ('/api/iserver/marketdata/', '/api/md/')
+
+_ACCOUNT_ID = re.compile(r'/(D?[UF]\d+)(?:/|$)')
+_CONTRACT_ID = re.compile(r'/(\d+)(?:/|$)')
+
+
+def _not_sent(error: requests.ConnectionError) -> bool:
+    """Tells if a connection error happened before the request could reach the gateway."""
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    return isinstance(reason, (NewConnectionError, ConnectTimeoutError))
+
+
+def account_of(endpoint: str, params: dict = None, json_payload: dict = None) -> str:
+    """Returns the account a request is about, found in its endpoint, params or payload."""
+    match = _ACCOUNT_ID.search(endpoint)
+    if match:
+        return match.group(1)
+
+    for source in (params, json_payload):
+        if isinstance(source, dict):
+            for key in ('accountId', 'acctId', 'account_id'):
+                if source.get(key):
+                    return str(source[key])
+
+    return None
+
+
+def contract_of(endpoint: str, params: dict = None) -> str:
+    """Returns the contract a market data request is about, the first one for a snapshot."""
+    if not endpoint.startswith(MARKET_DATA):
+        return None
+
+    if isinstance(params, dict):
+        if params.get('conids'):
+            return str(params['conids']).split(',')[0]
+        if params.get('conid'):
+            return str(params['conid'])
+
+    match = _CONTRACT_ID.search(endpoint)
+    return match.group(1) if match else None
+
+
+class Gateway:
+    """One Client Portal gateway, with its own session and request budget.
+
+    The budget is a token bucket refilled at `rate` requests per second,
+    holding at most `burst` tokens.
+    """
+
+    def __init__(self, url: str, name: str = None, rate: float = 10.0, burst: int = 10) -> None:
+        """Initializes the `Gateway`.
+
+        Args:
+            url (str): The resource URL, example is 'https://ibgw:5000/v1'.
+            name (str, optional): The name used in the logs and the shard map. Defaults to `url`.
+            rate (float, optional): The requests per second the gateway is allowed. Defaults to 10.
+            burst (int, optional): The requests allowed at once after an idle period. Defaults to 10.
+        """
+        self.url = url.rstrip('/')
+        self.name = name or self.url
+        self.rate = rate
+        self.burst = burst
+        self.healthy = True
+        self.in_flight = 0
+
+        self.session = requests.Session()
+        self.session.verify = False
+
+        self._tokens = float(burst)
+        self._refilled = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Takes a token from the budget, sleeping until one is available.
+
+        Returns:
+            float: The seconds waited.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate)
+            self._refilled = now
+            self._tokens -= 1
+            self.in_flight += 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    def release(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def check_health(self) -> bool:
+        """Asks the gateway whether its brokerage session is authenticated and updates `healthy`."""
+        try:
+            response = self.session.post(self.url + '/api/iserver/auth/status', timeout=5)
+            status = response.json() if response.ok else {}
+            self.healthy = bool(status.get('authenticated') and status.get('connected', True))
+        except (requests.RequestException, ValueError):
+            self.healthy = False
+
+        if not self.healthy:
+            logging.warning('Gateway %s is unhealthy.', self.name)
+        return self.healthy
+
+    def __repr__(self) -> str:
+        return f'Gateway({self.name!r}, healthy={self.healthy}, in_flight={self.in_flight})'
+
+
+class GatewayPool:
+    """Spreads the requests over several gateways and fails over between them.
+
+    Every gateway has its own session, and the session holds state: the
+    accounts and portfolio pre-calls and the market data subscriptions. So
+    the requests about an account always go to the same gateway, the one in
+    `shards` or else one picked by hashing the account, and the market data
+    requests about a contract to the one picked by hashing the contract. The
+    pre-calls of `SESSION_SETUP` are sent to every gateway, and sent again
+    to a gateway whose session a health check finds restored. The other
+    requests go to the healthy gateway with the fewest requests in flight.
+
+    A gateway that does not answer, or answers as if its session dropped, is
+    marked unhealthy and only tried once the healthy ones failed. GET
+    requests are then retried on the next gateway; the others only when the
+    connection could not be opened, so an order is never sent twice.
+    `start_health_checks` brings gateways back once their session is restored.
+
+    ### Usage
+    ----
+        >>> from ibc import gateways
+        >>> gateways.configure([Gateway('https://ibgw-1:5000/v1'), Gateway('https://ibgw-2:5000/v1')],
+        ...                    shards={'U1234567': 'https://ibgw-2:5000/v1'})
+        >>> gateways.pool.start_health_checks(interval=30)
+    """
+
+    def __init__(self, gateways: List[Gateway], shards: Dict[str, str] = None) -> None:
+        """Initializes the `GatewayPool`.
+
+        Args:
+            gateways (List[Gateway]): The gateways, at least one.
+            shards (Dict[str, str], optional): Gateway names by account ID, the other
+                accounts are spread by hashing them.
+        """
+        if not gateways:
+            raise ValueError('A gateway pool needs at least one gateway.')
+
+        self.gateways = list(gateways)
+        self.shards = shards or {}
+        self._by_name = {gateway.name: gateway for gateway in self.gateways}
+        self._setup: Dict[str, str] = {}
+        self._stop = threading.Event()
+
+    def home(self, account_id: str = None, contract_id: str = None) -> Gateway:
+        """Returns the gateway holding the session state of an account or contract.
+
+        Args:
+            account_id (str, optional): The account, takes precedence over the contract.
+            contract_id (str, optional): The contract of a market data request.
+
+        Returns:
+            Gateway: The gateway, `None` if neither is given.
+        """
+        if account_id is not None:
+            home = self._by_name.get(self.shards.get(account_id))
+            if home is not None:
+                return home
+            key = account_id
+        elif contract_id is not None:
+            key = str(contract_id)
+        else:
+            return None
+
+        return self.gateways[zlib.crc32(key.encode()) % len(self.gateways)]
+
+    def route(self, account_id: str = None, contract_id: str = None) -> List[Gateway]:
+        """Returns the gateways to try for a request, in order.
+
+        Args:
+            account_id (str, optional): The account the request is about.
+            contract_id (str, optional): The contract a market data request is about.
+
+        Returns:
+            List[Gateway]: The healthy gateways by preference, then the unhealthy ones as a last resort.
+        """
+        home = self.home(account_id, contract_id)
+        if home is not None:
+            start = self.gateways.index(home)
+            ordered = self.gateways[start:] + self.gateways[:start]
+        else:
+            ordered = sorted(self.gateways, key=lambda gateway: gateway.in_flight)
+
+        return [gateway for gateway in ordered if gateway.healthy] + \
+               [gateway for gateway in ordered if not gateway.healthy]
+
+    def _send(self, gateway: Gateway, method: str, endpoint: str, template: str, **kwargs) -> requests.Response:
+        waited = gateway.acquire()
+        if waited:
+            metrics.sink.observe_wait('rate_limit', template, waited)
+
+        try:
+            return gateway.session.request(method, gateway.url + endpoint, **kwargs)
+        finally:
+            gateway.release()
+
+    def _broadcast(self, method: str, endpoint: str, template: str, **kwargs) -> requests.Response:
+        """Sends a session pre-call to every gateway and returns the first good response."""
+        self._setup[endpoint] = method
+
+        answer = None
+        error = None
+        for gateway in self.route():
+            try:
+                response = self._send(gateway, method, endpoint, template, **kwargs)
+            except requests.ConnectionError as e:
+                gateway.healthy = False
+                logging.warning('Gateway %s is unreachable, skipping %s.', gateway.name, endpoint)
+                error = e
+                continue
+
+            gateway.healthy = response.status_code not in SESSION_LOST
+            if answer is None or (response.ok and not answer.ok):
+                answer = response
+
+        if answer is None:
+            raise error
+        return answer
+
+    def request(self, method: str, endpoint: str, account_id: str = None, contract_id: str = None,
+                **kwargs) -> requests.Response:
+        """Sends a request to the first gateway that answers.
+
+        Args:
+            method (str): The request method.
+            endpoint (str): The API URL endpoint, appended to the gateway URL.
+            account_id (str, optional): The account the request is about.
+            contract_id (str, optional): The contract a market data request is about.
+            **kwargs: Passed on to `requests.Session.request`.
+
+        Returns:
+            requests.Response: The response of the first gateway with a live session, or the
+                               last response received if none has one or it cannot be resent.
+        """
+        template = metrics.endpoint_template(endpoint)
+        if endpoint in SESSION_SETUP:
+            return self._broadcast(method, endpoint, template, **kwargs)
+
+        candidates = self.route(account_id, contract_id)
+        failed_at = None
+
+        retry_safe = method.upper() in IDEMPOTENT
+
+        for attempt, gateway in enumerate(candidates):
+            last = attempt == len(candidates) - 1
+
+            if failed_at is not None:
+                metrics.sink.observe_wait('retry', template, time.perf_counter() - failed_at)
+
+            try:
+                response = self._send(gateway, method, endpoint, template, **kwargs)
+            except requests.ConnectionError as e:
+                gateway.healthy = False
+                # The gateway may have received the request, sending an order twice is worse than failing.
+                if last or not (retry_safe or _not_sent(e)):
+                    raise
+                logging.warning('Gateway %s is unreachable, failing over.', gateway.name)
+                failed_at = time.perf_counter()
+                continue
+
+            if response.status_code in SESSION_LOST:
+                gateway.healthy = False
+                if retry_safe and not last:
+                    logging.warning('Gateway %s lost its session, failing over.', gateway.name)
+                    failed_at = time.perf_counter()
+                    continue
+            else:
+                gateway.healthy = True
+
+            return response
+
+    def check_health(self) -> None:
+        """Checks every gateway, and sends the session pre-calls again to the ones restored."""
+        for gateway in self.gateways:
+            was_healthy = gateway.healthy
+            if gateway.check_health() and not was_healthy:
+                for endpoint, method in list(self._setup.items()):
+                    try:
+                        gateway.session.request(method, gateway.url + endpoint)
+                    except requests.RequestException:
+                        logging.warning('Gateway %s failed the pre-call %s.', gateway.name, endpoint)
+
+    def start_health_checks(self, interval: float = 30.0) -> threading.Thread:
+        """Checks every gateway every `interval` seconds, in a daemon thread."""
+        def _loop():
+            while not self._stop.wait(interval):
+                self.check_health()
+
+        thread = threading.Thread(target=_loop, name='ibc-gateway-health', daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self) -> None:
+        """Stops the health checks."""
+        self._stop.set()
+
+
+# The pool requests are sent through, `None` sends them to `RESOURCE_URL`.
+pool: GatewayPool = None
+
+
+def configure(gateways: List[Gateway], shards: Dict[str, str] = None) -> GatewayPool:
+    """Sends every request of the process through a pool of the given gateways.
+
+    Args:
+        gateways (List[Gateway]): The gateways, at least one.
+        shards (Dict[str, str], optional): Gateway names by account ID, the other
+            accounts are spread by hashing them.
+
+    Returns:
+        GatewayPool: The new pool.
+    """
+    global pool
+    pool = GatewayPool(gateways, shards=shards)
+    return pool
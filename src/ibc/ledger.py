@@ -0,0 +1,210 @@
+import os
+import json
+import bisect
+import threading
+
+from datetime import date
+from datetime import datetime
+from datetime import timedelta
+from typing import Dict
+from typing import List
+from collections import Counter
+
+from ibc.tasks.portfolio_analysis import transactions_history
+
+
+# The columns kept for every transaction and the `Transaction` resource keys they come from.
+COLUMNS = {
+    'date': 'rawDate',
+    'type': 'type',
+    'quantity': 'qty',
+    'price': 'pr',
+    'amount': 'amt',
+    'currency': 'cur',
+    'fx_rate': 'fxRate',
+    'description': 'desc'
+}
+
+
+def _row_key(columns: Dict[str, list], index: int) -> tuple:
+    return tuple(columns[name][index] for name in COLUMNS)
+
+
+class TransactionLedger:
+    """A local, append-only store of the transaction history.
+
+    Transactions are stored per account and contract as columns. Every
+    sync appends one columnar segment per contract to
+    `{root}/{account_id}/{contract_id}.jsonl` and only asks the gateway
+    for the days since the previous sync, so the history is pulled once
+    and range queries are answered locally.
+
+    ### Usage
+    ----
+        >>> ledger = TransactionLedger(root='data/transactions')
+        >>> ledger.sync(account_id='U1234567', contract_ids=['265598'])
+        >>> ledger.query(account_id='U1234567', contract_id='265598', start='20210101')
+    """
+
+    def __init__(self, root: str) -> None:
+        """Initializes the `TransactionLedger`.
+
+        Args:
+            root (str): The directory holding the ledger files.
+        """
+        self.root = root
+        self._columns = {}
+        self._lock = threading.Lock()
+
+        os.makedirs(root, exist_ok=True)
+
+        state_path = os.path.join(root, 'sync.json')
+        if os.path.exists(state_path):
+            with open(state_path, mode='r') as state_file:
+                self._synced = json.load(state_file)
+        else:
+            self._synced = {}
+
+    def _path(self, account_id: str, contract_id: str) -> str:
+        return os.path.join(self.root, str(account_id), f'{contract_id}.jsonl')
+
+    def _load(self, account_id: str, contract_id: str) -> Dict[str, list]:
+        key = (str(account_id), str(contract_id))
+
+        if key not in self._columns:
+            columns = {name: [] for name in COLUMNS}
+            path = self._path(account_id, contract_id)
+
+            if os.path.exists(path):
+                with open(path, mode='r') as segments:
+                    for line in segments:
+                        segment = json.loads(line)
+                        for name in COLUMNS:
+                            columns[name].extend(segment[name])
+
+            self._columns[key] = self._sorted(columns)
+
+        return self._columns[key]
+
+    def _sorted(self, columns: Dict[str, list]) -> Dict[str, list]:
+        dates = columns['date']
+        if all(dates[i] <= dates[i + 1] for i in range(len(dates) - 1)):
+            return columns
+
+        order = sorted(range(len(dates)), key=dates.__getitem__)
+        return {name: [values[i] for i in order] for name, values in columns.items()}
+
+    def _append(self, account_id: str, contract_id: str, transactions: List[dict], window_start: str) -> int:
+        columns = self._load(account_id, contract_id)
+
+        # Overlapping days are fetched again, only keep what we do not have yet. Identical
+        # transactions on the same day are legitimate, so compare counts and not just keys.
+        first = bisect.bisect_left(columns['date'], window_start)
+        known = Counter(_row_key(columns, i) for i in range(first, len(columns['date'])))
+
+        segment = {name: [] for name in COLUMNS}
+        for transaction in transactions:
+            row = tuple(transaction.get(source) for source in COLUMNS.values())
+            if known[row] > 0:
+                known[row] -= 1
+                continue
+
+            for name, value in zip(COLUMNS, row):
+                segment[name].append(value)
+
+        if not segment['date']:
+            return 0
+
+        path = self._path(account_id, contract_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, mode='a') as segments:
+            segments.write(json.dumps(segment) + '\n')
+
+        for name in COLUMNS:
+            columns[name].extend(segment[name])
+        self._columns[(str(account_id), str(contract_id))] = self._sorted(columns)
+
+        return len(segment['date'])
+
+    def _save_state(self) -> None:
+        state_path = os.path.join(self.root, 'sync.json')
+        with open(state_path + '.tmp', mode='w') as state_file:
+            json.dump(self._synced, state_file)
+        os.replace(state_path + '.tmp', state_path)
+
+    def last_synced(self, account_id: str, contract_id: str) -> str:
+        """Returns the last synced day as 'YYYYMMDD', `None` if never synced."""
+        return self._synced.get(f'{account_id}:{contract_id}')
+
+    def sync(self, account_id: str, contract_ids: List[str], currency: str = 'USD',
+             max_days: int = 90, today: date = None) -> Dict[str, int]:
+        """Fetches the transactions since the last sync and appends the new ones.
+
+        Contracts that were never synced fetch `max_days` of history, the others
+        fetch from their last synced day onwards, however long ago that was, so
+        the stored history has no gaps. Contracts needing the same window share
+        a single request.
+
+        Args:
+            account_id (str): The account to sync.
+            contract_ids (List[str]): The contracts to sync.
+            currency (str, optional): The currency for which to return values. Defaults to 'USD'.
+            max_days (int, optional): The window of the first sync. Defaults to 90.
+            today (date, optional): The current day. Defaults to `date.today()`.
+
+        Returns:
+            Dict[str, int]: The number of new transactions per contract.
+        """
+        today = today or date.today()
+        windows = {}
+
+        for contract_id in contract_ids:
+            last = self.last_synced(account_id, contract_id)
+            if last is None:
+                days = max_days
+            else:
+                # The gateway only counts days back from today, a long gap is fetched in one
+                # request, capping it would skip its first days and never fetch them again.
+                days = (today - datetime.strptime(last, '%Y%m%d').date()).days + 1
+            windows.setdefault(max(days, 1), []).append(str(contract_id))
+
+        added = {}
+        for days, window_contract_ids in windows.items():
+            response = transactions_history(
+                account_ids=[account_id],
+                contract_ids=window_contract_ids,
+                currency=currency,
+                days=days
+            )
+
+            by_contract = {contract_id: [] for contract_id in window_contract_ids}
+            for transaction in response.get('transactions', []):
+                by_contract.setdefault(str(transaction.get('conid')), []).append(transaction)
+
+            window_start = (today - timedelta(days=days - 1)).strftime('%Y%m%d')
+            with self._lock:
+                for contract_id, transactions in by_contract.items():
+                    added[contract_id] = self._append(account_id, contract_id, transactions, window_start)
+                    self._synced[f'{account_id}:{contract_id}'] = today.strftime('%Y%m%d')
+                self._save_state()
+
+        return added
+
+    def query(self, account_id: str, contract_id: str, start: str = None, end: str = None) -> Dict[str, list]:
+        """Returns the stored transactions of a contract between two days, inclusive.
+
+        Args:
+            account_id (str): The account to query.
+            contract_id (str): The contract to query.
+            start (str, optional): The first day as 'YYYYMMDD'. Defaults to the first stored day.
+            end (str, optional): The last day as 'YYYYMMDD'. Defaults to the last stored day.
+
+        Returns:
+            Dict[str, list]: The transactions as columns, see `COLUMNS`.
+        """
+        with self._lock:
+            columns = self._load(account_id, contract_id)
+            lower = 0 if start is None else bisect.bisect_left(columns['date'], start)
+            upper = len(columns['date']) if end is None else bisect.bisect_right(columns['date'], end)
+
+            return {name: values[lower:upper] for name, values in columns.items()}
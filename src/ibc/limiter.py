@@ -0,0 +1,180 @@
+import math
+import time
+import threading
+
+from typing import Dict
+
+from . import metrics
+
+
+# The status codes of a gateway asking us to slow down.
+THROTTLED = (429, 503)
+
+
+# The endpoint templates sharing one limit, by class name. Every other
+# template is a class of its own, endpoints of one prefix such as snapshot
+# and history have latencies too far apart to share a baseline.
+CLASSES = {
+    '/api/iserver/account/{id}/order': 'orders',
+    '/api/iserver/account/{id}/orders': 'orders',
+    '/api/iserver/account/{id}/order/{id}': 'orders',
+    '/api/iserver/account/{id}/order/whatif': 'orders',
+    '/api/iserver/reply/{id}': 'orders',
+}
+
+
+def endpoint_class(template: str) -> str:
+    """Returns the class of an endpoint template, the template itself unless `CLASSES` groups it."""
+    return CLASSES.get(template, template)
+
+
+class AdaptiveLimit:
+    """The number of requests of one endpoint class allowed in flight, adjusted by AIMD.
+
+    Every response that is fast enough adds `1 / limit`, so the limit
+    grows by one per window of requests. A response slower than `tolerance`
+    times the baseline latency shrinks it by `slowdown`, a throttled or
+    failed one by `backoff`. Only requests sent after the last decrease can
+    decrease it again, so a burst of bad responses counts once. The baseline
+    is the lowest latency of the last two `window` second periods, so it
+    follows a gateway that got slower.
+    """
+
+    def __init__(self, initial: float = 8.0, min_limit: float = 1.0, max_limit: float = 64.0,
+                 tolerance: float = 1.5, slowdown: float = 0.9, backoff: float = 0.5, window: float = 30.0) -> None:
+        self.limit = initial
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.tolerance = tolerance
+        self.slowdown = slowdown
+        self.backoff = backoff
+        self.window = window
+        self.in_flight = 0
+        self._decreased = 0.0
+        self._window_start = time.monotonic()
+        self._current_min = math.inf
+        self._previous_min = math.inf
+        self._condition = threading.Condition()
+
+    @property
+    def baseline(self) -> float:
+        """The lowest recent latency, `inf` until a response arrived."""
+        return min(self._current_min, self._previous_min)
+
+    def acquire(self) -> float:
+        """Waits for a free slot and takes it.
+
+        Returns:
+            float: The seconds waited, `0.0` if a slot was free.
+        """
+        waited = 0.0
+        with self._condition:
+            if self.in_flight >= int(self.limit):
+                start = time.perf_counter()
+                while self.in_flight >= int(self.limit):
+                    self._condition.wait()
+                waited = time.perf_counter() - start
+            self.in_flight += 1
+        return waited
+
+    def release(self, status_code: int, seconds: float) -> None:
+        """Frees the slot and adjusts the limit with the outcome of the request.
+
+        Args:
+            status_code (int): The response status code, `0` if no response was received.
+            seconds (float): The latency of the request.
+        """
+        now = time.monotonic()
+
+        with self._condition:
+            self.in_flight -= 1
+
+            throttled = status_code == 0 or status_code in THROTTLED
+            if not throttled:
+                if now - self._window_start > self.window:
+                    self._previous_min, self._current_min = self._current_min, math.inf
+                    self._window_start = now
+                self._current_min = min(self._current_min, seconds)
+
+            if throttled or seconds > self.tolerance * self.baseline:
+                if now - seconds >= self._decreased:
+                    factor = self.backoff if throttled else self.slowdown
+                    self.limit = max(self.min_limit, self.limit * factor)
+                    self._decreased = now
+            else:
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+
+            self._condition.notify_all()
+
+
+class AdaptiveLimiter:
+    """Keeps an `AdaptiveLimit` per endpoint class and reports them as metrics.
+
+    The limits are those of the process: workers each sending one request
+    at a time, such as prefork Celery workers, never queue on them and are
+    not throttled as a fleet.
+
+    ### Usage
+    ----
+        >>> from ibc import limiter
+        >>> limiter.enable(initial=8, max_limit=32)
+    """
+
+    def __init__(self, **limits) -> None:
+        """Initializes the `AdaptiveLimiter`.
+
+        Args:
+            **limits: The `AdaptiveLimit` arguments used for every endpoint class.
+        """
+        self._arguments = limits
+        self._limits: Dict[str, AdaptiveLimit] = {}
+        self._lock = threading.Lock()
+
+    def limit(self, template: str) -> AdaptiveLimit:
+        """Returns the limit of the class of an endpoint template."""
+        name = endpoint_class(template)
+        limit = self._limits.get(name)
+        if limit is None:
+            with self._lock:
+                limit = self._limits.setdefault(name, AdaptiveLimit(**self._arguments))
+        return limit
+
+    def limits(self) -> Dict[str, float]:
+        """Returns the current limit of every endpoint class."""
+        return {name: limit.limit for name, limit in self._limits.items()}
+
+    def acquire(self, template: str) -> None:
+        """Waits for a slot for a request to the endpoint template."""
+        waited = self.limit(template).acquire()
+        if waited:
+            metrics.sink.observe_wait('rate_limit', template, waited)
+
+    def release(self, template: str, status_code: int, seconds: float) -> None:
+        """Frees the slot of a finished request and reports the new limit."""
+        limit = self.limit(template)
+        limit.release(status_code, seconds)
+        metrics.sink.observe_limit(endpoint_class(template), limit.limit, limit.in_flight)
+
+
+# The limiter `make_request` waits on, `None` when disabled.
+adaptive: AdaptiveLimiter = None
+
+
+def enable(**limits) -> AdaptiveLimiter:
+    """Limits the requests in flight of this process per endpoint class.
+
+    Args:
+        **limits: The `AdaptiveLimit` arguments, example is `initial=8, max_limit=32`.
+
+    Returns:
+        AdaptiveLimiter: The new limiter.
+    """
+    global adaptive
+    adaptive = AdaptiveLimiter(**limits)
+    return adaptive
+
+
+def disable() -> None:
+    """Stops limiting the requests."""
+    global adaptive
+    adaptive = None
@@ -0,0 +1,111 @@
+import re
+import json
+import random
+
+from typing import Any
+
+
+# The maximum number of characters of a body written in an INFO record.
+BODY_LIMIT = 1024
+
+# The fraction of successful requests that get an INFO record.
+SAMPLE_RATE = 1.0
+
+# Keys whose values are replaced by `REDACTED` before being logged, compared in lower case.
+REDACTED_FIELDS = {'password', 'passwd', 'secret', 'token', 'session', 'cookie', 'set-cookie', 'authorization'}
+
+REDACTED = '***'
+
+_TEXT_FIELD = re.compile(r'("(?P<key>[^"\\]{1,64})"\s*:\s*)("(?:[^"\\]|\\.)*"|[^,}\]\s]+)')
+
+
+def redact(obj: Any) -> Any:
+    """Returns a copy of `obj` with the values of sensitive keys replaced.
+
+    Args:
+        obj (Any): A decoded JSON value, usually a dict or a list.
+
+    Returns:
+        Any: The redacted copy.
+    """
+    if isinstance(obj, dict):
+        return {
+            key: REDACTED if str(key).lower() in REDACTED_FIELDS else redact(value)
+            for key, value in obj.items()
+        }
+    elif isinstance(obj, (list, tuple)):
+        return [redact(value) for value in obj]
+
+    return obj
+
+
+def redact_text(text: str) -> str:
+    """Replaces the values of sensitive keys in a JSON encoded string.
+
+    Works on partial documents, which is what we are left with
+    once a body has been truncated.
+
+    Args:
+        text (str): The JSON text.
+
+    Returns:
+        str: The redacted text.
+    """
+    def _replace(match):
+        if match.group('key').lower() in REDACTED_FIELDS:
+            return f'{match.group(1)}"{REDACTED}"'
+        return match.group(0)
+
+    return _TEXT_FIELD.sub(_replace, text)
+
+
+def sampled() -> bool:
+    """Decides if a successful request should be logged, see `SAMPLE_RATE`."""
+    return SAMPLE_RATE >= 1.0 or random.random() < SAMPLE_RATE
+
+
+class Body:
+    """Formats a request or response body only when a record is emitted.
+
+    Pass instances as `%s` arguments to the logging calls, the body is
+    then redacted and truncated to `limit` characters only if a handler
+    actually writes the record.
+
+    ### Usage
+    ----
+        >>> logging.info('Response Content: %s', Body(response.content))
+    """
+
+    __slots__ = ('obj', 'limit')
+
+    def __init__(self, obj: Any, limit: int = -1) -> None:
+        """Initializes the `Body`.
+
+        Args:
+            obj (Any): A decoded JSON value, `str` or `bytes`.
+            limit (int, optional): The maximum number of characters, `None` disables truncation.
+                                   Defaults to `BODY_LIMIT`.
+        """
+        self.obj = obj
+        self.limit = BODY_LIMIT if limit == -1 else limit
+
+    def __str__(self) -> str:
+        obj = self.obj
+        size = None
+
+        if isinstance(obj, (bytes, bytearray)):
+            size = len(obj)
+            if self.limit is not None:
+                obj = obj[:self.limit]
+            text = redact_text(obj.decode('utf-8', errors='replace'))
+        elif isinstance(obj, str):
+            size = len(obj)
+            text = redact_text(obj if self.limit is None else obj[:self.limit])
+        else:
+            text = json.dumps(redact(obj), default=str)
+            size = len(text)
+
+        if self.limit is not None and size > self.limit:
+            return f'{text[:self.limit]}... ({size - self.limit} more)'
+
+        return text
@@ -0,0 +1,224 @@
+import re
+import time
+import logging
+
+from functools import lru_cache
+
+from celery.signals import before_task_publish
+from celery.signals import task_prerun
+
+
+SENT_AT_HEADER = 'ibc_sent_at'
+
+_ID_SEGMENT = re.compile(r'[^/]*\d[^/]*')
+
+
+@lru_cache(maxsize=1024)
+def endpoint_template(endpoint: str) -> str:
+    """Collapses the variable parts of an endpoint into a template.
+
+    Any path segment containing a digit (account numbers, contract IDs,
+    order IDs, page numbers) is replaced by `{id}` so metrics are grouped
+    per endpoint and not per resource.
+
+    Args:
+        endpoint (str): The API URL endpoint, example is '/api/portfolio/U1234567/ledger'.
+
+    Returns:
+        str: The endpoint template, example is '/api/portfolio/{id}/ledger'.
+    """
+    return _ID_SEGMENT.sub('{id}', endpoint)
+
+
+class MetricsSink:
+    """Receives the measurements taken by the library.
+
+    The base class discards everything, subclass it and override the
+    methods you are interested in to forward the numbers somewhere else.
+
+    ### Usage
+    ----
+        >>> from ibc import metrics
+        >>> metrics.set_sink(metrics.PrometheusSink())
+    """
+
+    def observe_request(self, method: str, endpoint: str, status_code: int, seconds: float,
+                        bytes_out: int, bytes_in: int) -> None:
+        """Records a finished gateway request.
+
+        Args:
+            method (str): The request method.
+            endpoint (str): The endpoint template, see `endpoint_template`.
+            status_code (int): The response status code, `0` if no response was received.
+            seconds (float): The wall time of the request.
+            bytes_out (int): The size of the request body.
+            bytes_in (int): The size of the response body.
+        """
+
+    def observe_wait(self, reason: str, endpoint: str, seconds: float) -> None:
+        """Records time spent waiting before a request could be sent.
+
+        Args:
+            reason (str): Why we waited, example is 'retry' or 'rate_limit'.
+            endpoint (str): The endpoint template, see `endpoint_template`.
+            seconds (float): The time spent waiting.
+        """
+
+    def observe_queue_latency(self, task_name: str, seconds: float) -> None:
+        """Records the time between publishing a task and a worker starting it.
+
+        Args:
+            task_name (str): The name of the Celery task.
+            seconds (float): The time the task spent in the queue.
+        """
+
+    def observe_limit(self, endpoint_class: str, limit: float, in_flight: int) -> None:
+        """Records the concurrency limit of an endpoint class, see `ibc.limiter`.
+
+        Args:
+            endpoint_class (str): The endpoint class, example is '/api/iserver/marketdata/snapshot'.
+            limit (float): The current number of requests allowed in flight.
+            in_flight (int): The number of requests in flight.
+        """
+
+
+class InMemorySink(MetricsSink):
+    """Keeps raw measurements in lists, useful for debugging and tests."""
+
+    def __init__(self) -> None:
+        self.requests = []
+        self.waits = []
+        self.queue_latencies = []
+        self.limits = {}
+
+    def observe_request(self, method, endpoint, status_code, seconds, bytes_out, bytes_in):
+        self.requests.append((method, endpoint, status_code, seconds, bytes_out, bytes_in))
+
+    def observe_wait(self, reason, endpoint, seconds):
+        self.waits.append((reason, endpoint, seconds))
+
+    def observe_queue_latency(self, task_name, seconds):
+        self.queue_latencies.append((task_name, seconds))
+
+    def observe_limit(self, endpoint_class, limit, in_flight):
+        self.limits[endpoint_class] = (limit, in_flight)
+
+
+class PrometheusSink(MetricsSink):
+    """Exports the measurements through `prometheus_client`.
+
+    Requires the optional `prometheus_client` package.
+    """
+
+    def __init__(self, namespace: str = 'ibc', registry=None) -> None:
+        from prometheus_client import Counter
+        from prometheus_client import Gauge
+        from prometheus_client import Histogram
+        from prometheus_client import REGISTRY
+
+        registry = registry or REGISTRY
+
+        self.request_latency = Histogram(
+            'request_duration_seconds', 'Gateway request latency.',
+            ['method', 'endpoint'], namespace=namespace, registry=registry
+        )
+        self.responses = Counter(
+            'responses_total', 'Gateway responses by status code.',
+            ['method', 'endpoint', 'status_code'], namespace=namespace, registry=registry
+        )
+        self.bytes_out = Counter(
+            'request_bytes_total', 'Bytes sent to the gateway.',
+            ['method', 'endpoint'], namespace=namespace, registry=registry
+        )
+        self.bytes_in = Counter(
+            'response_bytes_total', 'Bytes received from the gateway.',
+            ['method', 'endpoint'], namespace=namespace, registry=registry
+        )
+        self.wait = Histogram(
+            'wait_duration_seconds', 'Time spent waiting before a request was sent.',
+            ['reason', 'endpoint'], namespace=namespace, registry=registry
+        )
+        self.queue_latency = Histogram(
+            'task_queue_duration_seconds', 'Time between publishing a task and its start.',
+            ['task'], namespace=namespace, registry=registry
+        )
+        self.limit = Gauge(
+            'concurrency_limit', 'Requests allowed in flight by the adaptive limiter.',
+            ['endpoint_class'], namespace=namespace, registry=registry
+        )
+        self.in_flight = Gauge(
+            'requests_in_flight', 'Requests in flight per endpoint class.',
+            ['endpoint_class'], namespace=namespace, registry=registry
+        )
+
+    def observe_request(self, method, endpoint, status_code, seconds, bytes_out, bytes_in):
+        self.request_latency.labels(method, endpoint).observe(seconds)
+        self.responses.labels(method, endpoint, str(status_code)).inc()
+        self.bytes_out.labels(method, endpoint).inc(bytes_out)
+        self.bytes_in.labels(method, endpoint).inc(bytes_in)
+
+    def observe_wait(self, reason, endpoint, seconds):
+        self.wait.labels(reason, endpoint).observe(seconds)
+
+    def observe_queue_latency(self, task_name, seconds):
+        self.queue_latency.labels(task_name).observe(seconds)
+
+    def observe_limit(self, endpoint_class, limit, in_flight):
+        self.limit.labels(endpoint_class).set(limit)
+        self.in_flight.labels(endpoint_class).set(in_flight)
+
+
+sink = MetricsSink()
+
+
+def set_sink(new_sink: MetricsSink) -> None:
+    """Replaces the sink receiving all the library measurements.
+
+    Args:
+        new_sink (MetricsSink): The sink to use from now on.
+    """
+    global sink
+    sink = new_sink
+
+
+def start_exporter(port: int = 9100, addr: str = '0.0.0.0') -> PrometheusSink:
+    """Installs a `PrometheusSink` and serves it over HTTP.
+
+    Every process exposes its own endpoint, so give each worker
+    process its own port.
+
+    Args:
+        port (int, optional): The port to listen on. Defaults to 9100.
+        addr (str, optional): The address to bind to. Defaults to '0.0.0.0'.
+
+    Returns:
+        PrometheusSink: The installed sink.
+
+    Usage:
+        >>> from ibc import metrics
+        >>> metrics.start_exporter(port=9100)
+    """
+    from prometheus_client import start_http_server
+
+    prometheus_sink = PrometheusSink()
+    start_http_server(port, addr=addr)
+    set_sink(prometheus_sink)
+    return prometheus_sink
+
+
+@before_task_publish.connect
+def _stamp_sent_at(headers: dict = None, **kwargs) -> None:
+    if headers is not None:
+        headers[SENT_AT_HEADER] = time.time()
+
+
+@task_prerun.connect
+def _observe_queue_latency(task=None, **kwargs) -> None:
+    sent_at = getattr(task.request, SENT_AT_HEADER, None)
+    if sent_at is None:
+        return
+
+    try:
+        sink.observe_queue_latency(task.name, max(time.time() - sent_at, 0.0))
+    except Exception:
+        logging.exception(msg='Failed to record queue latency.')
@@ -0,0 +1,169 @@
+import re
+import time
+import hashlib
+import logging
+import threading
+
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Tuple
+from collections import OrderedDict
+from collections import deque
+
+from ibc.tasks.data import news_briefings
+from ibc.tasks.data import portfolio_news
+from ibc.tasks.data import top_news
+
+
+# The news endpoints polled by default and their poll interval in seconds.
+DEFAULT_SOURCES = {
+    'portfolio': (portfolio_news, 60.0),
+    'top': (top_news, 60.0),
+    'briefings': (news_briefings, 300.0)
+}
+
+_ID_KEYS = ('id', 'newsId', 'articleId')
+_TEXT_KEYS = ('headline', 'title', 'summary', 'text', 'body')
+_SPACES = re.compile(r'\s+')
+
+
+def article_keys(article: dict) -> List[str]:
+    """Returns the keys identifying an article: its ID and the hash of its content.
+
+    The same story is returned by several endpoints, sometimes without an
+    ID, so articles are matched on either key.
+
+    Args:
+        article (dict): A `NewsArticle` resource.
+
+    Returns:
+        List[str]: The keys of the article.
+    """
+    keys = [f'id:{article[key]}' for key in _ID_KEYS if article.get(key)]
+
+    text = ' '.join(str(article[key]) for key in _TEXT_KEYS if article.get(key))
+    if text:
+        normalized = _SPACES.sub(' ', text).strip().lower()
+        keys.append('sha1:' + hashlib.sha1(normalized.encode('utf-8')).hexdigest())
+
+    return keys
+
+
+def _articles(response) -> list:
+    if isinstance(response, list):
+        return response
+
+    if isinstance(response, dict):
+        for value in response.values():
+            if isinstance(value, list):
+                return value
+
+    return []
+
+
+class NewsFeed:
+    """Polls the news endpoints and emits every article only once.
+
+    Every source has its own poll interval. Articles are deduplicated
+    across sources by ID or content hash, the last `maxlen` keys and
+    articles are kept, older ones are forgotten.
+
+    ### Usage
+    ----
+        >>> feed = NewsFeed()
+        >>> feed.subscribe(lambda article: print(article['_source'], article.get('headline')))
+        >>> feed.run(stop=threading.Event())
+    """
+
+    def __init__(self, sources: Dict[str, Tuple[Callable[[], list], float]] = None, maxlen: int = 10000) -> None:
+        """Initializes the `NewsFeed`.
+
+        Args:
+            sources (Dict[str, Tuple[Callable[[], list], float]], optional): The function fetching
+                    every source and its poll interval in seconds. Defaults to `DEFAULT_SOURCES`.
+            maxlen (int, optional): The number of articles remembered. Defaults to 10000.
+        """
+        self.sources = DEFAULT_SOURCES if sources is None else sources
+        self.maxlen = maxlen
+        self.articles = deque(maxlen=maxlen)
+        self._seen = OrderedDict()
+        self._due = {name: 0.0 for name in self.sources}
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback: Callable[[dict], None]) -> None:
+        """Registers a function called with every new article."""
+        self._subscribers.append(callback)
+
+    def _remember(self, keys: List[str]) -> None:
+        for key in keys:
+            self._seen[key] = None
+            self._seen.move_to_end(key)
+
+        # An article has an ID and a hash, so keep twice as many keys as articles.
+        while len(self._seen) > 2 * self.maxlen:
+            self._seen.popitem(last=False)
+
+    def ingest(self, source: str, response) -> List[dict]:
+        """Adds the articles of a response and emits the new ones.
+
+        Args:
+            source (str): The name of the source, stored under `_source`.
+            response (Union[list, dict]): The response of the source.
+
+        Returns:
+            List[dict]: The articles not seen before.
+        """
+        new = []
+        with self._lock:
+            for article in _articles(response):
+                keys = article_keys(article)
+                if not keys or any(key in self._seen for key in keys):
+                    self._remember(keys)
+                    continue
+
+                self._remember(keys)
+                article = dict(article, _source=source)
+                self.articles.append(article)
+                new.append(article)
+
+        for article in new:
+            for callback in self._subscribers:
+                callback(article)
+
+        return new
+
+    def poll(self, now: float = None) -> List[dict]:
+        """Fetches the sources that are due and returns the new articles.
+
+        Args:
+            now (float, optional): The current `time.monotonic()`.
+
+        Returns:
+            List[dict]: The articles not seen before.
+        """
+        now = time.monotonic() if now is None else now
+        new = []
+
+        for name, (fetch, interval) in self.sources.items():
+            if self._due[name] > now:
+                continue
+
+            self._due[name] = now + interval
+            try:
+                new.extend(self.ingest(name, fetch()))
+            except Exception:
+                logging.exception('Polling the %s news failed.', name)
+
+        return new
+
+    def run(self, stop: threading.Event) -> None:
+        """Polls the sources until `stop` is set.
+
+        Args:
+            stop (threading.Event): Set it to end the loop.
+        """
+        while not stop.is_set():
+            self.poll()
+            stop.wait(max(min(self._due.values()) - time.monotonic(), 0.1))
@@ -0,0 +1,254 @@
+import time
+import logging
+
+from datetime import datetime
+from datetime import timedelta
+from typing import Dict
+from typing import List
+from typing import Union
+from enum import Enum
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from ibc import FieldProfiles
+from ibc.cache import TTLCache
+from ibc.fields import to_float
+from ibc.subscriptions import field_ids
+from ibc.tasks.contract import search_symbol
+from ibc.tasks.contract import secdef_info
+from ibc.tasks.contract import strikes
+from ibc.tasks.market_data import snapshot
+
+
+# The snapshot fields requested for every option of a chain.
+CHAIN_FIELDS = field_ids(FieldProfiles.Quote.value + FieldProfiles.Greeks.value)
+
+# The maximum number of contracts requested in one snapshot call.
+SNAPSHOT_BATCH_SIZE = 100
+
+# Chain definitions are kept until their first expiry, months of an
+# underlying without options are checked again after a day.
+_definitions = TTLCache(ttl=24 * 60 * 60, maxsize=512)
+
+
+def _underlying(symbol: str, contract_id: str = None) -> dict:
+    for contract in search_symbol(symbol=symbol) or []:
+        if contract_id is None or str(contract.get('conid')) == str(contract_id):
+            return contract
+
+    raise ValueError(f'No contract found for {symbol!r}.')
+
+
+def _months(underlying: dict) -> List[str]:
+    for section in underlying.get('sections', []):
+        if section.get('secType') == 'OPT':
+            return [month for month in section.get('months', '').split(';') if month]
+    return []
+
+
+def option_months(symbol: str, contract_id: str = None) -> List[str]:
+    """Returns the option months of an underlying, example is ['JAN24', 'FEB24'].
+
+    Args:
+        symbol (str): The symbol of the underlying.
+        contract_id (str, optional): The contract ID of the underlying, picks the
+            right one when the symbol is listed several times. Defaults to the first.
+
+    Returns:
+        List[str]: The months, in the order of the gateway.
+    """
+    return _months(_underlying(symbol, contract_id))
+
+
+def _seconds_until_expiry(contracts: List[dict]) -> float:
+    expiries = [contract.get('maturityDate') for contract in contracts if contract.get('maturityDate')]
+    if not expiries:
+        return _definitions.ttl
+
+    first = datetime.strptime(min(expiries), '%Y%m%d') + timedelta(days=1)
+    return max((first - datetime.now()).total_seconds(), 60.0)
+
+
+def _fetch_definitions(contract_id: str, months: List[str], exchange: str, max_workers: int) -> Dict[str, List[dict]]:
+    """Fetches the contracts of the months not cached yet, every month and strike concurrently."""
+    contract_id = str(contract_id)
+    definitions = {}
+    for month in months:
+        cached = _definitions.get((contract_id, month, exchange))
+        if cached is not None:
+            definitions[month] = cached
+
+    missing = [month for month in dict.fromkeys(months) if month not in definitions]
+    if not missing:
+        return definitions
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        available = dict(zip(missing, executor.map(
+            lambda month: strikes(contract_id=contract_id, month=month, exchange=exchange) or {}, missing
+        )))
+
+        jobs = [
+            (month, strike, right)
+            for month in missing
+            for right, side in (('C', 'call'), ('P', 'put'))
+            for strike in available[month].get(side, [])
+        ]
+
+        def _info(job):
+            month, strike, right = job
+            try:
+                return secdef_info(contract_id=contract_id, month=month, strike=strike, right=right,
+                                   exchange=exchange) or []
+            except Exception:
+                logging.exception('Fetching the %s %s %s options of %s failed.', month, strike, right, contract_id)
+                return None
+
+        results = list(executor.map(_info, jobs))
+
+    failed = set()
+    fetched = {month: [] for month in missing}
+    for (month, _, _), contracts in zip(jobs, results):
+        if contracts is None:
+            failed.add(month)
+        else:
+            fetched[month].extend(contracts)
+
+    for month, contracts in fetched.items():
+        # A month missing strikes is not cached, the next call fetches it again.
+        if month not in failed:
+            _definitions.set((contract_id, month, exchange), contracts, ttl=_seconds_until_expiry(contracts))
+        definitions[month] = contracts
+
+    return definitions
+
+
+def chain_definitions(contract_id: str, month: str, exchange: str = 'SMART', max_workers: int = 8) -> List[dict]:
+    """Returns the option contracts of an underlying for a month, cached until they expire.
+
+    The strikes are fetched first, then the contracts of every strike and
+    right concurrently. If any of them fails the month is returned without
+    it and not cached.
+
+    Args:
+        contract_id (str): The contract ID of the underlying.
+        month (str): The contract month, example is 'JAN24'.
+        exchange (str, optional): The exchange. Defaults to 'SMART'.
+        max_workers (int, optional): The maximum number of requests in flight. Defaults to 8.
+
+    Returns:
+        List[dict]: A collection of `Contract` resources.
+    """
+    return _fetch_definitions(contract_id, [month], exchange, max_workers)[month]
+
+
+class OptionChain:
+    """The options of an underlying as columns, sorted by expiry, strike and right.
+
+    ### Usage
+    ----
+        >>> chain = option_chain('AAPL', months=['JAN24'])
+        >>> chain.expiries, chain.strikes
+        >>> chain.grid('7308', right='C')   # the call deltas, one row per expiry and one column per strike
+        >>> chain.row('20240119', 150.0, 'P')
+    """
+
+    def __init__(self, contracts: List[dict], quotes: Dict[int, dict], fields: List[str]) -> None:
+        order = sorted(
+            range(len(contracts)),
+            key=lambda i: (contracts[i].get('maturityDate', ''), float(contracts[i].get('strike', 0)),
+                           contracts[i].get('right', ''))
+        )
+        contracts = [contracts[i] for i in order]
+
+        self.fields = fields
+        self.conid = np.array([int(contract['conid']) for contract in contracts], dtype=np.int64)
+        self.expiry = np.array([contract.get('maturityDate', '') for contract in contracts])
+        self.strike = np.array([float(contract.get('strike', 'nan')) for contract in contracts])
+        self.right = np.array([contract.get('right', '') for contract in contracts])
+        self.values = {
+            field: np.array([to_float(quotes.get(conid, {}).get(field)) for conid in self.conid.tolist()])
+            for field in fields
+        }
+
+        self.expiries = np.unique(self.expiry)
+        self.strikes = np.unique(self.strike)
+        self._rows = {
+            (expiry, strike, right): row
+            for row, (expiry, strike, right) in enumerate(zip(self.expiry.tolist(), self.strike.tolist(),
+                                                              self.right.tolist()))
+        }
+
+    def __len__(self) -> int:
+        return len(self.conid)
+
+    def row(self, expiry: str, strike: float, right: str) -> dict:
+        """Returns one option, or `None` if the chain does not have it."""
+        row = self._rows.get((expiry, float(strike), right))
+        if row is None:
+            return None
+
+        values = {field: float(column[row]) for field, column in self.values.items()}
+        return dict(values, conid=int(self.conid[row]), expiry=expiry, strike=float(strike), right=right)
+
+    def grid(self, field: Union[str, Enum], right: str) -> np.ndarray:
+        """Returns a field of the calls or puts as a matrix of `expiries` by `strikes`.
+
+        Args:
+            field (Union[str, Enum]): The snapshot field, example is `MarketDataFields.Delta`.
+            right (str): Either 'C' or 'P'.
+
+        Returns:
+            np.ndarray: The values, `nan` where the chain has no option.
+        """
+        field = field.value if isinstance(field, Enum) else field
+        mask = self.right == right
+
+        grid = np.full((len(self.expiries), len(self.strikes)), np.nan)
+        grid[np.searchsorted(self.expiries, self.expiry[mask]),
+             np.searchsorted(self.strikes, self.strike[mask])] = self.values[field][mask]
+        return grid
+
+
+def option_chain(symbol: str, months: List[str] = None, contract_id: str = None, exchange: str = 'SMART',
+                 fields: Union[Enum, List[Union[str, Enum]]] = None, max_workers: int = 8) -> OptionChain:
+    """Builds the option chain of an underlying with its quotes and greeks.
+
+    Args:
+        symbol (str): The symbol of the underlying.
+        months (List[str], optional): The months to include. Defaults to every option month.
+        contract_id (str, optional): The contract ID of the underlying. Defaults to the first
+            contract found for the symbol.
+        exchange (str, optional): The exchange. Defaults to 'SMART'.
+        fields (Union[Enum, List[Union[str, Enum]]], optional): The snapshot fields. Defaults to
+            the `FieldProfiles.Quote` and `FieldProfiles.Greeks` fields.
+        max_workers (int, optional): The maximum number of requests in flight. Defaults to 8.
+
+    Returns:
+        OptionChain: The chain.
+    """
+    fields = CHAIN_FIELDS if fields is None else field_ids(fields)
+
+    if contract_id is None or months is None:
+        underlying = _underlying(symbol, contract_id)
+        contract_id = str(underlying['conid'])
+        months = _months(underlying) if months is None else months
+
+    definitions = _fetch_definitions(contract_id, months, exchange, max_workers)
+    contracts = [contract for month in months for contract in definitions[month]]
+
+    contract_ids = list(dict.fromkeys(str(contract['conid']) for contract in contracts))
+    batches = [
+        contract_ids[i:i + SNAPSHOT_BATCH_SIZE]
+        for i in range(0, len(contract_ids), SNAPSHOT_BATCH_SIZE)
+    ]
+
+    started = time.perf_counter()
+    quotes = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for batch in executor.map(lambda batch: snapshot(contract_ids=batch, fields=fields), batches):
+            for quote in batch or []:
+                quotes[int(quote['conid'])] = quote
+
+    logging.debug('Quoted %d options of %s in %.1f s.', len(contract_ids), symbol, time.perf_counter() - started)
+    return OptionChain(contracts, quotes, fields)
@@ -0,0 +1,161 @@
+from typing import List
+from typing import Union
+from enum import Enum
+
+import numpy as np
+
+from ibc import Frequency
+from ibc.cache import TTLCache
+from ibc.tasks.portfolio_analysis import account_performance
+
+
+# How long, in seconds, the daily performance of a set of accounts is reused.
+PERFORMANCE_TTL = 15 * 60
+
+# The number of periods in a year, used to annualize volatility and Sharpe ratios.
+PERIODS_PER_YEAR = {'D': 252, 'M': 12, 'Q': 4}
+
+_daily_performance = TTLCache(ttl=PERFORMANCE_TTL, maxsize=64)
+
+
+class PerformanceSeries:
+    """The cumulative performance of several accounts as arrays.
+
+    Every row is an account and every column a date, so the statistics
+    of all the accounts are computed at once. Monthly and quarterly
+    series are derived locally from the daily one, which avoids a
+    gateway call per frequency.
+
+    ### Usage
+    ----
+        >>> series = daily_performance(account_ids=['U1234567', 'U7654321'])
+        >>> series.resample(Frequency.Monthly).returns()
+        >>> series.sharpe()
+    """
+
+    def __init__(self, account_ids: List[str], dates: np.ndarray, cumulative: np.ndarray, frequency: str = 'D') -> None:
+        """Initializes the `PerformanceSeries`.
+
+        Args:
+            account_ids (List[str]): The account of every row.
+            dates (np.ndarray): The dates as `int` 'YYYYMMDD', shape (dates,).
+            cumulative (np.ndarray): The cumulative returns, shape (accounts, dates).
+            frequency (str, optional): The frequency of the dates. Defaults to 'D'.
+        """
+        self.account_ids = account_ids
+        self.dates = dates
+        self.cumulative = cumulative
+        self.frequency = frequency
+
+    @classmethod
+    def from_response(cls, response: dict) -> 'PerformanceSeries':
+        """Builds the series from the cumulative returns of an `account_performance` response.
+
+        Args:
+            response (dict): A performance resource.
+
+        Returns:
+            PerformanceSeries: The series, one row per entry of `cps.data`.
+        """
+        cps = response['cps']
+        dates = np.asarray(cps['dates'], dtype=np.int64)
+        cumulative = np.full((len(cps['data']), len(dates)), np.nan)
+
+        # Accounts opened later have shorter series, which end on the last date.
+        for row, entry in enumerate(cps['data']):
+            returns = np.asarray(entry['returns'], dtype=float)
+            if len(returns):
+                cumulative[row, -len(returns):] = returns
+
+        return cls(
+            account_ids=[entry['id'] for entry in cps['data']],
+            dates=dates,
+            cumulative=cumulative,
+            frequency=cps.get('freq', 'D')
+        )
+
+    def resample(self, frequency: Union[str, Enum]) -> 'PerformanceSeries':
+        """Returns the series sampled at the end of every month or quarter.
+
+        Args:
+            frequency (Union[str, Enum]): 'M'onthly or 'Q'uarterly.
+
+        Returns:
+            PerformanceSeries: The resampled series.
+        """
+        if isinstance(frequency, Enum):
+            frequency = frequency.value
+
+        months = self.dates // 100
+        if frequency == 'M':
+            periods = months
+        elif frequency == 'Q':
+            periods = (months // 100) * 10 + (months % 100 - 1) // 3
+        else:
+            raise ValueError(f'Can not resample to frequency {frequency!r}.')
+
+        ends = np.append(np.flatnonzero(np.diff(periods)), len(periods) - 1)
+        return PerformanceSeries(self.account_ids, self.dates[ends], self.cumulative[:, ends], frequency)
+
+    def wealth(self) -> np.ndarray:
+        """Returns the growth of one unit invested at the start, shape (accounts, dates)."""
+        return 1.0 + self.cumulative
+
+    def returns(self) -> np.ndarray:
+        """Returns the return of every period, shape (accounts, dates)."""
+        wealth = self.wealth()
+        previous = np.ones_like(wealth)
+        previous[:, 1:] = wealth[:, :-1]
+
+        # The first period of an account starts from its first point, not from missing values.
+        previous = np.where(np.isnan(previous), 1.0, previous)
+        return wealth / previous - 1.0
+
+    def drawdowns(self) -> np.ndarray:
+        """Returns the drawdown from the running peak, shape (accounts, dates)."""
+        wealth = self.wealth()
+        peaks = np.fmax.accumulate(np.where(np.isnan(wealth), -np.inf, wealth), axis=1)
+        return wealth / peaks - 1.0
+
+    def max_drawdown(self) -> np.ndarray:
+        """Returns the deepest drawdown of every account, shape (accounts,)."""
+        return np.nanmin(self.drawdowns(), axis=1)
+
+    def volatility(self, annualize: bool = True) -> np.ndarray:
+        """Returns the standard deviation of the period returns, shape (accounts,)."""
+        volatility = np.nanstd(self.returns(), axis=1, ddof=1)
+        if annualize:
+            volatility = volatility * np.sqrt(PERIODS_PER_YEAR[self.frequency])
+        return volatility
+
+    def sharpe(self, risk_free: float = 0.0) -> np.ndarray:
+        """Returns the annualized Sharpe ratio of every account, shape (accounts,).
+
+        Args:
+            risk_free (float, optional): The annual risk free rate. Defaults to 0.0.
+        """
+        periods = PERIODS_PER_YEAR[self.frequency]
+        excess = self.returns() - risk_free / periods
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.nanmean(excess, axis=1) / np.nanstd(excess, axis=1, ddof=1) * np.sqrt(periods)
+
+
+def daily_performance(account_ids: List[str], ttl: float = PERFORMANCE_TTL) -> PerformanceSeries:
+    """Returns the daily performance of the accounts, fetched at most
+    once every `ttl` seconds by this process.
+
+    Args:
+        account_ids (List[str]): A list of account Numbers.
+        ttl (float, optional): How long the response is reused. Defaults to `PERFORMANCE_TTL`.
+
+    Returns:
+        PerformanceSeries: The daily series of the accounts.
+    """
+    key = tuple(sorted(account_ids))
+    response = _daily_performance.get_or_set(
+        key,
+        lambda: account_performance(account_ids=list(key), frequency=Frequency.Daily),
+        ttl=ttl
+    )
+    return PerformanceSeries.from_response(response)
@@ -0,0 +1,147 @@
+import math
+import time
+import threading
+
+from typing import Callable
+from typing import Dict
+from typing import List
+
+from ibc import MarketDataFields
+from ibc.fields import to_float
+from ibc.tasks.pnl import pnl_server_account
+
+
+class PnLEngine:
+    """Keeps the unrealized and daily PnL of an account up to date from price ticks.
+
+    The engine is seeded from the positions and the partitioned PnL of the
+    server, afterwards every tick moves both numbers by the change in value
+    of the position it belongs to, which is O(1) and needs no gateway call.
+    `reconcile` resets the local numbers to the server ones and records the
+    drift between them.
+
+    ### Usage
+    ----
+        >>> engine = PnLEngine('U1234567', positions=portfolio_positions('U1234567'))
+        >>> engine.on_tick(265598, {'31': '150.25'})
+        >>> engine.daily, engine.unrealized
+    """
+
+    def __init__(self, account_id: str, positions: List[dict], server_pnl: dict = None,
+                 on_update: Callable[['PnLEngine'], None] = None, reconcile_interval: float = 60.0) -> None:
+        """Initializes the `PnLEngine`.
+
+        Args:
+            account_id (str): The account the positions belong to.
+            positions (List[dict]): A collection of `Position` resources.
+            server_pnl (dict, optional): An `AccountPnL` resource, fetched when not given.
+            on_update (Callable[[PnLEngine], None], optional): Called after every tick that moved the PnL.
+            reconcile_interval (float, optional): The seconds between two reconciliations
+                                                  done by `maybe_reconcile`. Defaults to 60.
+        """
+        self.account_id = account_id
+        self.on_update = on_update
+        self.reconcile_interval = reconcile_interval
+        self.drift = {'daily': 0.0, 'unrealized': 0.0}
+        self._lock = threading.Lock()
+        self.seed(positions, server_pnl)
+
+    def seed(self, positions: List[dict], server_pnl: dict = None) -> None:
+        """Replaces the positions and reconciles against the server.
+
+        Call it again after fills, the engine does not track position changes.
+
+        Args:
+            positions (List[dict]): A collection of `Position` resources.
+            server_pnl (dict, optional): An `AccountPnL` resource, fetched when not given.
+        """
+        with self._lock:
+            self._rows = {int(position['conid']): row for row, position in enumerate(positions)}
+            self._units = [to_float(position.get('position')) * to_float(position.get('multiplier') or 1)
+                           for position in positions]
+            self._prices = [to_float(position.get('mktPrice')) for position in positions]
+            self._costs = [to_float(position.get('position')) * to_float(position.get('avgCost'))
+                           for position in positions]
+
+            # The drift is only meaningful between two reconciliations of the same positions.
+            self.daily = None
+            self.unrealized = None
+
+        self.reconcile(server_pnl)
+
+    def _local_unrealized(self) -> float:
+        return math.fsum(
+            units * price - cost
+            for units, price, cost in zip(self._units, self._prices, self._costs)
+            if not math.isnan(price)
+        )
+
+    def reconcile(self, server_pnl: dict = None) -> Dict[str, float]:
+        """Resets the PnL to the values of the server.
+
+        Args:
+            server_pnl (dict, optional): An `AccountPnL` resource, fetched when not given.
+
+        Returns:
+            Dict[str, float]: The drift of the local values before the reset.
+        """
+        if server_pnl is None:
+            server_pnl = pnl_server_account()
+
+        partition = server_pnl.get('upnl', {}).get(f'{self.account_id}.Core', {})
+
+        with self._lock:
+            local_unrealized = self._local_unrealized()
+            server_daily = to_float(partition.get('dpl', 0.0))
+            server_unrealized = to_float(partition.get('upl', local_unrealized))
+
+            if self.daily is not None:
+                self.drift = {'daily': self.daily - server_daily, 'unrealized': self.unrealized - server_unrealized}
+
+            self.daily = server_daily
+            self.unrealized = server_unrealized
+            self.reconciled_at = time.monotonic()
+
+            return self.drift
+
+    def maybe_reconcile(self) -> bool:
+        """Reconciles if `reconcile_interval` seconds passed since the last time.
+
+        Returns:
+            bool: `True` if the engine reconciled.
+        """
+        if time.monotonic() - self.reconciled_at < self.reconcile_interval:
+            return False
+
+        self.reconcile()
+        return True
+
+    def on_tick(self, contract_id: int, values: dict) -> None:
+        """Applies a price update.
+
+        Args:
+            contract_id (int): The contract the update is for.
+            values (dict): The snapshot fields of the update, keyed by field ID.
+        """
+        row = self._rows.get(int(contract_id))
+        if row is None:
+            return
+
+        price = to_float(values.get(MarketDataFields.LastPrice.value))
+        if math.isnan(price):
+            return
+
+        with self._lock:
+            previous = self._prices[row]
+            self._prices[row] = price
+
+            if math.isnan(previous):
+                change = self._units[row] * price - self._costs[row]
+                self.unrealized += change
+            else:
+                change = self._units[row] * (price - previous)
+                self.unrealized += change
+                self.daily += change
+
+        if self.on_update is not None and change:
+            self.on_update(self)
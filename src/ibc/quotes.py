@@ -0,0 +1,113 @@
+import time
+import threading
+
+from typing import Dict
+from typing import List
+from typing import Union
+from enum import Enum
+
+from ibc.subscriptions import field_ids
+from ibc.tasks.market_data import snapshot
+
+
+class QuoteTable:
+    """A shared table of the latest snapshot of every contract, refreshed with deltas.
+
+    The first request for a contract returns all its fields, the following
+    ones pass `since`, the last `_updated` time seen, so the gateway only
+    returns the fields that changed, which are merged into the row. Reads
+    are served from the table while it is younger than `max_age`; when it
+    is older, only one caller refreshes it and the others wait for that
+    refresh instead of sending their own.
+
+    ### Usage
+    ----
+        >>> quotes = QuoteTable(FieldProfiles.Quote, max_age=1.0)
+        >>> quotes.get(['265598', '8314'])
+        {265598: {'conid': 265598, '_updated': 1617301500000, '31': '150.25', ...}, ...}
+    """
+
+    def __init__(self, fields: Union[Enum, List[Union[str, Enum]]], max_age: float = 1.0) -> None:
+        """Initializes the `QuoteTable`.
+
+        Args:
+            fields (Union[Enum, List[Union[str, Enum]]]): A `FieldProfiles` member or a list of `MarketDataFields`.
+            max_age (float, optional): The seconds a row is served without a refresh. Defaults to 1.
+        """
+        self.fields = field_ids(fields)
+        self.max_age = max_age
+        self._rows: Dict[int, dict] = {}
+        self._refreshed: Dict[int, float] = {}
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _stale(self, contract_ids: List[int], max_age: float) -> List[int]:
+        oldest = time.monotonic() - max_age
+        with self._lock:
+            return [contract_id for contract_id in contract_ids if self._refreshed.get(contract_id, -1.0) < oldest]
+
+    def get(self, contract_ids: List[str], max_age: float = None) -> Dict[int, dict]:
+        """Returns the rows of the contracts, refreshing the stale ones first.
+
+        Args:
+            contract_ids (List[str]): A list of contract Ids.
+            max_age (float, optional): Overrides the `max_age` of the table for this read.
+
+        Returns:
+            Dict[int, dict]: A copy of the `MarketSnapshot` of every contract, by conid.
+        """
+        contract_ids = [int(contract_id) for contract_id in contract_ids]
+        max_age = self.max_age if max_age is None else max_age
+
+        if self._stale(contract_ids, max_age):
+            with self._refresh_lock:
+                # Another caller may have refreshed the rows while we waited for the lock.
+                stale = self._stale(contract_ids, max_age)
+                if stale:
+                    self.refresh(stale)
+
+        with self._lock:
+            return {contract_id: dict(self._rows.get(contract_id, {})) for contract_id in contract_ids}
+
+    def refresh(self, contract_ids: List[str]) -> None:
+        """Requests the changes of the contracts since their last update and merges them.
+
+        Contracts never seen before are requested in full, the others share
+        one request since the oldest of their `_updated` times.
+
+        Args:
+            contract_ids (List[str]): A list of contract Ids.
+        """
+        contract_ids = [int(contract_id) for contract_id in contract_ids]
+
+        with self._lock:
+            new = [contract_id for contract_id in contract_ids if contract_id not in self._rows]
+            known = [contract_id for contract_id in contract_ids if contract_id in self._rows]
+            updated = [self._rows[contract_id].get('_updated') for contract_id in known]
+
+        batches = []
+        if new:
+            batches.append((new, None))
+        if known:
+            batches.append((known, min(updated) if None not in updated else None))
+
+        for group, since in batches:
+            response = snapshot(contract_ids=[str(contract_id) for contract_id in group], since=since,
+                                fields=self.fields)
+            refreshed = time.monotonic()
+
+            with self._lock:
+                for delta in response or []:
+                    self._rows.setdefault(int(delta['conid']), {}).update(delta)
+                for contract_id in group:
+                    self._refreshed[contract_id] = refreshed
+
+    def forget(self, contract_ids: List[str]) -> None:
+        """Drops the rows of the contracts."""
+        with self._lock:
+            for contract_id in contract_ids:
+                self._rows.pop(int(contract_id), None)
+                self._refreshed.pop(int(contract_id), None)
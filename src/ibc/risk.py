@@ -0,0 +1,161 @@
+import math
+
+from typing import Dict
+from typing import List
+
+import numpy as np
+
+from ibc import MarketDataFields
+from ibc.fields import to_float
+
+
+# The per-line measures summed by `RiskBook.aggregate`.
+MEASURES = (
+    'market_value', 'delta', 'delta_dollars', 'beta_dollars',
+    'gamma', 'theta', 'vega'
+)
+
+# The groupings available in `RiskBook.aggregate`.
+GROUPS = ('underlying', 'sector', 'account', 'asset_class')
+
+# The asset classes whose value moves one for one with their underlying.
+LINEAR = ('STK', 'FUT', 'CFD', 'CASH', 'BOND', 'FUND')
+
+
+def _codes(labels: list) -> tuple:
+    keys, codes = np.unique(np.asarray(labels, dtype=str), return_inverse=True)
+    return keys, codes.ravel()
+
+
+class RiskBook:
+    """Positions joined with their snapshot fields, held as arrays.
+
+    The grouping codes are computed once, so re-aggregating the book after
+    a quote update is a handful of `np.bincount` calls whatever the number
+    of lines.
+
+    Greeks are per unit of underlying, so every measure is scaled by the
+    position and the contract multiplier. Linear instruments, the asset
+    classes of `LINEAR` such as stocks and futures, count as delta one per
+    unit whatever the snapshot holds. Options without a delta in the
+    snapshot count as zero and are listed by `missing_greeks`.
+
+    ### Usage
+    ----
+        >>> book = RiskBook(positions=portfolio_positions('U1234567'), quotes=snapshot(conids, fields=greeks))
+        >>> book.aggregate(by='underlying')
+    """
+
+    def __init__(self, positions: List[dict], quotes: List[dict]) -> None:
+        """Initializes the `RiskBook`.
+
+        Args:
+            positions (List[dict]): A collection of `Position` resources.
+            quotes (List[dict]): A `MarketSnapshot` resource for the positions and their underlyings.
+        """
+        self.size = len(positions)
+        self.contract_ids = np.array([int(position['conid']) for position in positions], dtype=np.int64)
+        self.underlying_ids = np.array(
+            [int(position.get('undConid') or position['conid']) for position in positions], dtype=np.int64
+        )
+        self.position = np.array([to_float(position.get('position')) for position in positions])
+        self.multiplier = np.array([to_float(position.get('multiplier') or 1) for position in positions])
+        self.is_linear = np.array([position.get('assetClass') in LINEAR for position in positions], dtype=bool)
+
+        # The same contract is held once per account, so a conid maps to every line holding it.
+        self._rows = {}
+        for row, contract_id in enumerate(self.contract_ids.tolist()):
+            self._rows.setdefault(contract_id, []).append(row)
+
+        self._underlying_rows = {}
+        for row, underlying_id in enumerate(self.underlying_ids.tolist()):
+            self._underlying_rows.setdefault(underlying_id, []).append(row)
+
+        self.price = np.full(self.size, np.nan)
+        self.underlying_price = np.full(self.size, np.nan)
+        self.beta = np.full(self.size, np.nan)
+        self.greeks = {name: np.full(self.size, np.nan) for name in ('delta', 'gamma', 'theta', 'vega')}
+        self.update_quotes(quotes)
+
+        industries = {int(quote.get('conid', -1)): quote.get(MarketDataFields.Industry.value) for quote in quotes}
+        sectors = [
+            position.get('sector') or industries.get(int(position['conid'])) or 'Unknown'
+            for position in positions
+        ]
+        self._groups = {
+            'underlying': _codes(self.underlying_ids.tolist()),
+            'sector': _codes(sectors),
+            'account': _codes([position.get('acctId') or '' for position in positions]),
+            'asset_class': _codes([position.get('assetClass') or '' for position in positions])
+        }
+
+    def update_quotes(self, quotes: List[dict]) -> None:
+        """Applies snapshot fields to the lines they belong to.
+
+        A quote updates the price and greeks of every line with its conid,
+        one per account holding it, and the underlying price and beta of
+        every line on that underlying.
+
+        Args:
+            quotes (List[dict]): A `MarketSnapshot` resource.
+        """
+        for quote in quotes:
+            contract_id = int(quote.get('conid', -1))
+            last = to_float(quote.get(MarketDataFields.LastPrice.value))
+
+            rows = self._rows.get(contract_id)
+            if rows is not None:
+                if not math.isnan(last):
+                    self.price[rows] = last
+                for name, field in (('delta', MarketDataFields.Delta), ('gamma', MarketDataFields.Gamma),
+                                    ('theta', MarketDataFields.Theta), ('vega', MarketDataFields.Vega)):
+                    if field.value in quote:
+                        self.greeks[name][rows] = to_float(quote[field.value])
+
+            rows = self._underlying_rows.get(contract_id)
+            if rows is not None:
+                if not math.isnan(last):
+                    self.underlying_price[rows] = last
+                if MarketDataFields.Beta.value in quote:
+                    self.beta[rows] = to_float(quote[MarketDataFields.Beta.value])
+
+    def exposures(self) -> Dict[str, np.ndarray]:
+        """Returns every measure of `MEASURES` per line, shape (lines,)."""
+        units = self.position * self.multiplier
+        delta = np.where(self.is_linear, 1.0, np.nan_to_num(self.greeks['delta']))
+        underlying_price = np.where(np.isnan(self.underlying_price), self.price, self.underlying_price)
+
+        delta_shares = delta * units
+        delta_dollars = np.nan_to_num(delta_shares * underlying_price)
+
+        return {
+            'market_value': np.nan_to_num(units * self.price),
+            'delta': delta_shares,
+            'delta_dollars': delta_dollars,
+            'beta_dollars': delta_dollars * np.nan_to_num(self.beta, nan=1.0),
+            'gamma': np.nan_to_num(self.greeks['gamma']) * units,
+            'theta': np.nan_to_num(self.greeks['theta']) * units,
+            'vega': np.nan_to_num(self.greeks['vega']) * units
+        }
+
+    def aggregate(self, by: str = 'underlying') -> Dict[str, np.ndarray]:
+        """Sums the exposures per group.
+
+        Args:
+            by (str, optional): One of `GROUPS`. Defaults to 'underlying'.
+
+        Returns:
+            Dict[str, np.ndarray]: The group keys under 'key' and one array per measure.
+        """
+        keys, codes = self._groups[by]
+        exposures = self.exposures()
+
+        aggregated = {'key': keys}
+        for name in MEASURES:
+            aggregated[name] = np.bincount(codes, weights=exposures[name], minlength=len(keys))
+
+        return aggregated
+
+    def missing_greeks(self) -> np.ndarray:
+        """Returns the conids of the non linear lines without a delta in the snapshot."""
+        return self.contract_ids[~self.is_linear & np.isnan(self.greeks['delta'])]
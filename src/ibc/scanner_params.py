@@ -0,0 +1,113 @@
+from typing import Dict
+from typing import List
+from typing import Set
+
+
+class ScannerValidationError(ValueError):
+    """Raised when a scanner definition does not match the scanner parameters."""
+
+    def __init__(self, errors: List[str]) -> None:
+        self.errors = errors
+        super().__init__('Invalid scanner definition: ' + '; '.join(errors))
+
+
+class ScannerParams:
+    """An index of the scanner parameters returned by `/iserver/scanner/params`.
+
+    Used to validate and normalize scanner definitions locally, so a
+    malformed definition never costs a gateway request.
+
+    ### Usage
+    ----
+        >>> params = ScannerParams(scanners())
+        >>> params.normalize({"instrument": "stk", "type": "top_perc_gain", "location": "STK.US.MAJOR"})
+    """
+
+    def __init__(self, params: dict) -> None:
+        """Initializes the `ScannerParams`.
+
+        Args:
+            params (dict): The response of the `scanners` task.
+        """
+        self.scan_types: Dict[str, Set[str]] = {}
+        self.instrument_filters: Dict[str, Set[str]] = {}
+        self.locations: Dict[str, Set[str]] = {}
+        self.filters: Dict[str, str] = {}
+
+        for scan_type in params.get('scan_type_list', []):
+            self.scan_types[scan_type['code']] = set(scan_type.get('instruments', []))
+
+        for instrument in params.get('instrument_list', []):
+            self.instrument_filters[instrument['type']] = set(instrument.get('filters', []))
+
+        for scanner_filter in params.get('filter_list', []):
+            self.filters[scanner_filter['code'].lower()] = scanner_filter['code']
+
+        for node in params.get('location_tree', []):
+            self.locations[node['type']] = self._walk_locations(node.get('locations', []), set())
+
+    def _walk_locations(self, nodes: List[dict], found: Set[str]) -> Set[str]:
+        for node in nodes:
+            found.add(node['type'])
+            self._walk_locations(node.get('locations', []), found)
+
+        return found
+
+    def normalize(self, scanner: dict) -> dict:
+        """Validates a scanner definition and returns it in canonical form.
+
+        Instrument, type and location are upper-cased, filter codes are
+        matched case-insensitively and filters without a value are dropped.
+
+        Args:
+            scanner (dict): A scanner definition.
+
+        Raises:
+            ScannerValidationError: If the definition uses unknown or incompatible parameters.
+
+        Returns:
+            dict: The normalized scanner definition.
+        """
+        errors = []
+        normalized = dict(scanner)
+
+        instrument = str(scanner.get('instrument', '')).strip().upper()
+        scan_type = str(scanner.get('type', '')).strip().upper()
+        location = str(scanner.get('location', '')).strip().upper()
+
+        if instrument not in self.instrument_filters:
+            errors.append(f'unknown instrument {instrument!r}')
+
+        if scan_type not in self.scan_types:
+            errors.append(f'unknown scan type {scan_type!r}')
+        elif instrument in self.instrument_filters and instrument not in self.scan_types[scan_type]:
+            errors.append(f'scan type {scan_type!r} is not available for instrument {instrument!r}')
+
+        if instrument in self.locations and location not in self.locations[instrument]:
+            errors.append(f'unknown location {location!r} for instrument {instrument!r}')
+
+        filters = []
+        for scanner_filter in scanner.get('filter', []):
+            if scanner_filter.get('value') is None:
+                continue
+
+            code = self.filters.get(str(scanner_filter.get('code', '')).lower())
+            if code is None:
+                errors.append(f'unknown filter {scanner_filter.get("code")!r}')
+                continue
+
+            allowed = self.instrument_filters.get(instrument)
+            if allowed and code not in allowed:
+                errors.append(f'filter {code!r} is not available for instrument {instrument!r}')
+                continue
+
+            filters.append({'code': code, 'value': scanner_filter['value']})
+
+        if errors:
+            raise ScannerValidationError(errors)
+
+        normalized.update({'instrument': instrument, 'type': scan_type, 'location': location, 'filter': filters})
+        if 'size' in normalized:
+            normalized['size'] = str(normalized['size'])
+
+        return normalized
@@ -0,0 +1,181 @@
+import os
+import sys
+
+from typing import Dict
+from typing import List
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from ibc.fields import to_float
+
+
+# The snapshot fields stored in the table, by column.
+COLUMNS = {
+    'bid': '84',
+    'ask': '86',
+    'last': '31',
+    'bid_size': '88',
+    'ask_size': '85',
+    'volume': '87'
+}
+
+ROW = np.dtype(
+    [('conid', '<i8'), ('seq', '<u8'), ('updated', '<i8')] +
+    [(column, '<f8') for column in COLUMNS]
+)
+
+# The header holds the number of rows used and the capacity, padded to a cache line.
+_HEADER = np.dtype([('count', '<u8'), ('capacity', '<u8'), ('_pad', '<u8', 6)])
+
+
+class SharedQuoteTable:
+    """A quote table in shared memory, written by one process and read by many.
+
+    Rows are a NumPy structured array with a fixed layout, one per contract,
+    so the workers read the quotes in place instead of deserializing them.
+    Each row carries a sequence number, odd while the writer is updating it:
+    `read` copies a row and retries if the number changed or was odd meanwhile,
+    so it never returns a half written row. Rows are only ever appended, every
+    process keeps its own conid to row index and extends it when it meets a
+    contract it does not know yet.
+
+    Only one process may write, it creates the table, the others attach to it
+    by name. Needs Python 3.8 or newer.
+
+    ### Usage
+    ----
+        >>> # In the process fed by `snapshot` or a streaming connection.
+        >>> table = SharedQuoteTable.create('ibc-quotes', capacity=10000)
+        >>> table.ingest(snapshot(contract_ids=['265598'], fields=FieldProfiles.Quote))
+        >>> # In the workers.
+        >>> table = SharedQuoteTable.attach('ibc-quotes')
+        >>> table.read(265598)['last']
+    """
+
+    def __init__(self, memory: shared_memory.SharedMemory, owner: bool) -> None:
+        self._memory = memory
+        self._owner = owner
+        self._header = np.ndarray((1,), dtype=_HEADER, buffer=memory.buf)[0]
+        capacity = int(self._header['capacity'])
+        self.rows = np.ndarray((capacity,), dtype=ROW, buffer=memory.buf, offset=_HEADER.itemsize)
+        self._seq = self.rows['seq']
+        self._index: Dict[int, int] = {}
+
+    @classmethod
+    def create(cls, name: str, capacity: int) -> 'SharedQuoteTable':
+        """Creates the table, in the writing process.
+
+        Args:
+            name (str): The name the readers attach with.
+            capacity (int): The maximum number of contracts.
+
+        Returns:
+            SharedQuoteTable: The table, owning the shared memory.
+        """
+        memory = shared_memory.SharedMemory(name=name, create=True, size=_HEADER.itemsize + capacity * ROW.itemsize)
+        header = np.ndarray((1,), dtype=_HEADER, buffer=memory.buf)
+        header['count'] = 0
+        header['capacity'] = capacity
+
+        table = cls(memory, owner=True)
+        table.rows[:] = np.zeros(capacity, dtype=ROW)
+        return table
+
+    @classmethod
+    def attach(cls, name: str) -> 'SharedQuoteTable':
+        """Attaches to a table created by another process.
+
+        Readers never track the shared memory, otherwise the first reader
+        to exit would free the table under the writer and the other readers.
+        """
+        if sys.version_info >= (3, 13):
+            return cls(shared_memory.SharedMemory(name=name, track=False), owner=False)
+
+        memory = shared_memory.SharedMemory(name=name)
+        if os.name == 'posix':
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(memory._name, 'shared_memory')
+        return cls(memory, owner=False)
+
+    def __len__(self) -> int:
+        return int(self._header['count'])
+
+    def _row(self, contract_id: int) -> int:
+        row = self._index.get(contract_id)
+        if row is None:
+            # Index the rows appended since the last miss.
+            count = int(self._header['count'])
+            for new_row in range(len(self._index), count):
+                self._index[int(self.rows['conid'][new_row])] = new_row
+            row = self._index.get(contract_id)
+        return row
+
+    def on_tick(self, contract_id: int, values: dict) -> None:
+        """Writes the fields of a tick to the row of the contract, adding it if needed.
+
+        Args:
+            contract_id (int): The contract Id.
+            values (dict): The snapshot fields of the tick, keyed by field ID.
+        """
+        contract_id = int(contract_id)
+        row = self._row(contract_id)
+
+        if row is None:
+            row = int(self._header['count'])
+            if row == len(self.rows):
+                raise IndexError(f'The quote table is full, its capacity is {len(self.rows)} contracts.')
+
+            self.rows[row] = np.zeros(1, dtype=ROW)
+            self.rows['conid'][row] = contract_id
+            for column in COLUMNS:
+                self.rows[column][row] = np.nan
+
+            # Publish the row only once its conid is written.
+            self._header['count'] = row + 1
+            self._index[contract_id] = row
+
+        self._seq[row] += 1
+        for column, field in COLUMNS.items():
+            if field in values:
+                self.rows[column][row] = to_float(values[field])
+        if '_updated' in values:
+            self.rows['updated'][row] = int(values['_updated'])
+        self._seq[row] += 1
+
+    def ingest(self, response: List[dict]) -> None:
+        """Writes every row of a `snapshot` response."""
+        for values in response:
+            self.on_tick(values['conid'], values)
+
+    def read(self, contract_id: int) -> np.void:
+        """Returns a consistent copy of the row of a contract, or `None` if it is not in the table."""
+        row = self._row(int(contract_id))
+        if row is None:
+            return None
+
+        while True:
+            before = int(self._seq[row])
+            if before & 1:
+                continue
+
+            values = self.rows[row].copy()
+            if int(self._seq[row]) == before:
+                return values
+
+    def column(self, name: str) -> np.ndarray:
+        """Returns a column of the used rows, without copying.
+
+        The values are read as they are, a row being written may be seen
+        half updated, use `read` when the fields of a row must agree.
+        """
+        return self.rows[name][:len(self)]
+
+    def close(self) -> None:
+        """Detaches from the table, the writer also frees the shared memory."""
+        self._header = None
+        self.rows = None
+        self._seq = None
+        self._memory.close()
+        if self._owner:
+            self._memory.unlink()
@@ -0,0 +1,120 @@
+import threading
+
+from typing import Dict
+from typing import List
+from typing import Set
+from typing import Union
+from enum import Enum
+
+from ibc.tasks.market_data import snapshot
+from ibc.tasks.market_data import unsubscribe
+
+
+def field_ids(fields: Union[Enum, List[Union[str, Enum]]]) -> List[str]:
+    """Converts a `FieldProfiles` member or a list of `MarketDataFields` to field IDs.
+
+    Args:
+        fields (Union[Enum, List[Union[str, Enum]]]): The fields.
+
+    Returns:
+        List[str]: The field IDs, in order and without duplicates.
+    """
+    if isinstance(fields, Enum):
+        fields = fields.value
+
+    ids = [field.value if isinstance(field, Enum) else str(field) for field in fields]
+    return list(dict.fromkeys(ids))
+
+
+class SubscriptionRegistry:
+    """Tracks the snapshot fields open on every contract.
+
+    A snapshot opens a market data subscription on the gateway for the
+    requested fields, and the gateway keeps returning those fields for
+    the contract afterwards. The registry remembers what is open, so a
+    follow-up call only asks for the fields not open yet, and hands every
+    consumer only the fields it asked for.
+
+    ### Usage
+    ----
+        >>> registry = SubscriptionRegistry()
+        >>> registry.snapshot(['265598'], FieldProfiles.Quote)
+        >>> registry.snapshot(['265598'], FieldProfiles.Greeks)
+    """
+
+    def __init__(self) -> None:
+        self._open: Dict[str, Set[str]] = {}
+        self._values: Dict[str, dict] = {}
+        self._updated: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def open_fields(self, contract_id: str) -> Set[str]:
+        """Returns the field IDs open on a contract."""
+        with self._lock:
+            return set(self._open.get(str(contract_id), ()))
+
+    def snapshot(self, contract_ids: List[str], fields: Union[Enum, List[Union[str, Enum]]]) -> List[dict]:
+        """Returns the requested fields of the contracts, opening only the missing ones.
+
+        Contracts missing the same fields share one request. Contracts with
+        every field already open are refreshed with a single request too.
+
+        Args:
+            contract_ids (List[str]): A list of contract Ids.
+            fields (Union[Enum, List[Union[str, Enum]]]): A `FieldProfiles` member or a list of `MarketDataFields`.
+
+        Returns:
+            List[dict]: One `MarketSnapshot` per contract, holding only `conid`, `_updated`
+                        and the requested fields. `_updated` is the time of the least
+                        recently updated of them.
+        """
+        fields = field_ids(fields)
+        contract_ids = [str(contract_id) for contract_id in contract_ids]
+
+        with self._lock:
+            groups = {}
+            for contract_id in contract_ids:
+                missing = frozenset(fields) - self._open.get(contract_id, set())
+                groups.setdefault(missing, []).append(contract_id)
+
+        for missing, group in groups.items():
+            requested = [field for field in fields if field in missing] or fields
+            response = snapshot(contract_ids=group, fields=requested)
+
+            with self._lock:
+                for contract_id in group:
+                    self._open.setdefault(contract_id, set()).update(missing)
+                for row in response:
+                    contract_id = str(row.get('conid'))
+                    self._values.setdefault(contract_id, {}).update(row)
+                    # A row only refreshes the fields it holds, the others keep their own time.
+                    updated = self._updated.setdefault(contract_id, {})
+                    for field in row:
+                        if field not in ('conid', '_updated'):
+                            updated[field] = row.get('_updated')
+
+        with self._lock:
+            projected = []
+            for contract_id in contract_ids:
+                values = self._values.get(contract_id, {})
+                updated = self._updated.get(contract_id, {})
+                times = [updated[field] for field in fields if updated.get(field) is not None]
+                row = {'conid': values.get('conid', int(contract_id)), '_updated': min(times) if times else None}
+                row.update({field: values[field] for field in fields if field in values})
+                projected.append(row)
+
+        return projected
+
+    def unsubscribe(self, contract_ids: List[str]) -> None:
+        """Cancels the subscriptions of the contracts and forgets their fields.
+
+        Args:
+            contract_ids (List[str]): A list of contract Ids.
+        """
+        for contract_id in contract_ids:
+            unsubscribe(contract_id=str(contract_id))
+
+            with self._lock:
+                self._open.pop(str(contract_id), None)
+                self._values.pop(str(contract_id), None)
+                self._updated.pop(str(contract_id), None)
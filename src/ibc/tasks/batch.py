@@ -0,0 +1,75 @@
+import logging
+
+from typing import Dict
+from typing import Union
+from concurrent.futures import ThreadPoolExecutor
+
+from ibc.celery import app
+from ibc import make_request
+
+
+# The maximum number of requests of one batch in flight at once.
+BATCH_CONCURRENCY = 8
+
+
+def _error(error: Exception) -> dict:
+    """Describes a failed call, with the status code when the gateway answered."""
+    described = {'error': f'{type(error).__name__}: {error}'}
+
+    response = getattr(error, 'response', None)
+    if response is not None:
+        described['status_code'] = response.status_code
+    return described
+
+
+@app.task
+def batch(calls: Union[Dict[str, dict], list], max_workers: int = BATCH_CONCURRENCY) -> dict:
+    """Runs many requests concurrently in one task.
+
+    Loading a dashboard takes a dozen small requests, sending them as one
+    task costs one broker round trip instead of one per request. A failing
+    request does not fail the batch, its error is returned in its place.
+
+    The portfolio endpoints need `/portfolio/accounts` to be called first,
+    which is done once for the whole batch if any call needs it. If that
+    call fails its error is returned for every portfolio call, the others
+    still run.
+
+    Args:
+        calls (Union[Dict[str, dict], list]): The `make_request` arguments of every call,
+            keyed by a name or as a list, keyed by position then.
+            Example is `{'summary': {'method': 'get', 'endpoint': '/api/portfolio/U1234567/summary'}}`.
+        max_workers (int, optional): The maximum number of requests in flight. Defaults to `BATCH_CONCURRENCY`.
+
+    Returns:
+        dict: Keyed like `calls`, either `{'result': ...}` or `{'error': '...'}`
+              for every call, plus `status_code` when the gateway answered with an error.
+    """
+    if isinstance(calls, list):
+        calls = {str(i): call for i, call in enumerate(calls)}
+
+    def _portfolio(call):
+        return call.get('endpoint', '').startswith('/api/portfolio/')
+
+    results = {}
+    if any(_portfolio(call) for call in calls.values()):
+        try:
+            make_request(method='get', endpoint='/api/portfolio/accounts')
+        except Exception as e:
+            logging.warning('Batch call to /api/portfolio/accounts failed: %s', e)
+            error = _error(e)
+            results = {key: error for key, call in calls.items() if _portfolio(call)}
+
+    def _call(item):
+        key, call = item
+        try:
+            return key, {'result': make_request(**call)}
+        except Exception as e:
+            logging.warning('Batch call %s to %s failed: %s', key, call.get('endpoint'), e)
+            return key, _error(e)
+
+    pending = [(key, call) for key, call in calls.items() if key not in results]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results.update(executor.map(_call, pending))
+
+    return {key: results[key] for key in calls}
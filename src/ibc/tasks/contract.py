@@ -1,7 +1,7 @@
 from typing import List
 
 from ibc.celery import app
-from ibc.session import make_request
+from ibc import make_request
 
 
 def contract_info(contract_id: str) -> dict:
@@ -80,3 +80,69 @@ def search_multiple_contracts(contract_ids: List[int]) -> list:
     }
 
     return make_request(method='post', endpoint=f'/api/trsrv/secdef', json_payload=payload)
+
+
+@app.task
+def strikes(contract_id: str, month: str, security_type: str = 'OPT', exchange: str = 'SMART') -> dict:
+    """Returns the strikes of the options or warrants on a contract for a month.
+
+    Args:
+        contract_id (str): The contract ID of the underlying.
+        month (str): The contract month, example is 'JAN24', see the `sections`
+            of `search_symbol`.
+        security_type (str, optional): Either 'OPT' or 'WAR'. Defaults to 'OPT'.
+        exchange (str, optional): The exchange. Defaults to 'SMART'.
+
+    Returns:
+        dict: The strikes, under `call` and `put`.
+
+    Usage:
+        >>> ibc.strikes(
+            contract_id='265598',
+            month='JAN24'
+        )
+    """
+    params = {
+        'conid': contract_id,
+        'sectype': security_type,
+        'month': month,
+        'exchange': exchange
+    }
+
+    return make_request(method='get', endpoint='/api/iserver/secdef/strikes', params=params)
+
+
+@app.task
+def secdef_info(contract_id: str, month: str, strike: float = None, right: str = None,
+                security_type: str = 'OPT', exchange: str = 'SMART') -> list:
+    """Returns the option, warrant or future contracts on a contract for a month and strike.
+
+    Args:
+        contract_id (str): The contract ID of the underlying.
+        month (str): The contract month, example is 'JAN24'.
+        strike (float, optional): The strike, required for options and warrants.
+        right (str, optional): Either 'C' or 'P', required for options and warrants.
+        security_type (str, optional): One of 'OPT', 'WAR' or 'FUT'. Defaults to 'OPT'.
+        exchange (str, optional): The exchange. Defaults to 'SMART'.
+
+    Returns:
+        list: A collection of `Contract` resources, one per expiry in the month.
+
+    Usage:
+        >>> ibc.secdef_info(
+            contract_id='265598',
+            month='JAN24',
+            strike=150.0,
+            right='C'
+        )
+    """
+    params = {
+        'conid': contract_id,
+        'sectype': security_type,
+        'month': month,
+        'exchange': exchange,
+        'strike': strike,
+        'right': right
+    }
+
+    return make_request(method='get', endpoint='/api/iserver/secdef/info', params=params)
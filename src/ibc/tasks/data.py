@@ -29,7 +29,7 @@ def news_sources() -> dict:
     Returns:
         list: A collection of `Sources` resources.
     """
-    return make_request(method='get', endpoint=f'/api/iserver/news/top')
+    return make_request(method='get', endpoint=f'/api/iserver/news/sources')
 
 
 @app.task
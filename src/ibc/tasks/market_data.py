@@ -1,9 +1,12 @@
+from typing import Iterator
 from typing import Union
 from typing import List
 from enum import Enum
 
 from ibc.celery import app
+from ibc import gateways
 from ibc import make_request
+from ibc import stream_request
 
 
 @app.task
@@ -13,13 +16,15 @@ def snapshot(contract_ids: List[str], since: int = None, fields: Union[str, Enum
     The end-point will return by default bid, ask,  last, change, change pct, close,
     listing exchange. The endpoint /iserver/accounts should be called prior to
     /iserver/marketdata/snapshot. To receive all available fields the /snapshot
-    endpoint will need to be called several times.
+    endpoint will need to be called several times. With a gateway pool the
+    contracts are split by the gateway holding their subscription.
 
     Args:
         contract_ids (List[str]): A list of contract Ids.
 
-        frequency (Union[str, Enum]): Frequency of cumulative performance data points:
-                                      'D'aily, 'M'onthly,'Q'uarterly. Can be one of 3 possible values: "D" "M" "Q".
+        since (int, optional): Epoch time in milliseconds, only return the fields updated since then.
+
+        fields (Union[str, Enum], optional): A list of `MarketDataFields`, or a `FieldProfiles` member.
 
     Returns:
         dict: A `MarketSnapshot` resource.
@@ -30,6 +35,10 @@ def snapshot(contract_ids: List[str], since: int = None, fields: Union[str, Enum
 
     new_fields = []
 
+    # Lists of fields such as `MarketDataFields.All` or a `FieldProfiles` member.
+    if isinstance(fields, Enum) and isinstance(fields.value, list):
+        fields = fields.value
+
     if fields:
         # Check for Enums.
         for field in fields:
@@ -42,15 +51,41 @@ def snapshot(contract_ids: List[str], since: int = None, fields: Union[str, Enum
     else:
         fields = None
 
+    # The subscriptions live in the session of a gateway, every contract is asked to its own.
+    groups = {}
+    for contract_id in contract_ids:
+        home = gateways.pool.home(contract_id=contract_id) if gateways.pool is not None else None
+        groups.setdefault(home, []).append(contract_id)
+
+    if len(groups) > 1:
+        response = []
+        for group in groups.values():
+            params = {'conids': ','.join(group), 'since': since, 'fields': fields}
+            response.extend(make_request(method='get', endpoint='/api/iserver/marketdata/snapshot', params=params))
+        return response
+
     # Define the payload.
     params = {'conids': ','.join(contract_ids), 'since': since, 'fields': fields}
 
     return make_request(method='get', endpoint='/api/iserver/marketdata/snapshot', params=params)
 
 
+@app.task
+def unsubscribe(contract_id: str) -> dict:
+    """Cancels the market data subscription of a contract opened by `snapshot`.
+
+    Args:
+        contract_id (str): A contract Id.
+
+    Returns:
+        dict: A confirmation message.
+    """
+    return make_request(method='get', endpoint=f'/api/iserver/marketdata/{contract_id}/unsubscribe')
+
+
 @app.task
 def market_history(contract_id: str, period: str, bar: Union[str, Enum] = None, exchange: str = None,
-                   outside_regular_trading_hours: bool = True) -> dict:
+                   outside_regular_trading_hours: bool = True, start_time: str = None) -> dict:
     """Get historical market Data for given conid, length of data
     is controlled by 'period' and 'bar'.
 
@@ -61,6 +96,8 @@ def market_history(contract_id: str, period: str, bar: Union[str, Enum] = None,
         exchange (str, optional): Exchange of the conid. Defaults to None.
         outside_regular_trading_hours (bool, optional): For contracts that support it, will determine if historical
                                                         data includes outside of regular trading hours. Defaults to True.
+        start_time (str, optional): The end of the requested period as 'YYYYMMDD-HH:mm:ss', the gateway
+                                    returns `period` of bars up to this time. Defaults to now.
 
     Returns:
         dict: A collection `Bar` resources.
@@ -68,14 +105,32 @@ def market_history(contract_id: str, period: str, bar: Union[str, Enum] = None,
     Usage:
         >>> ibc.market_history(contract_id=['265598'])
     """
+    payload = _history_params(contract_id, period, bar, exchange, outside_regular_trading_hours, start_time)
+    return make_request(method='get', endpoint='/api/iserver/marketdata/history', params=payload)
+
+
+def stream_history(contract_id: str, period: str, bar: Union[str, Enum] = None, exchange: str = None,
+                   outside_regular_trading_hours: bool = True, start_time: str = None) -> Iterator[dict]:
+    """Same as `market_history`, but yields the bars as they are received
+    instead of decoding the whole response at once.
+
+    Returns:
+        Iterator[dict]: The `Bar` resources.
+    """
+    payload = _history_params(contract_id, period, bar, exchange, outside_regular_trading_hours, start_time)
+    return stream_request(method='get', endpoint='/api/iserver/marketdata/history', params=payload, path='data')
+
+
+def _history_params(contract_id: str, period: str, bar: Union[str, Enum], exchange: str,
+                    outside_regular_trading_hours: bool, start_time: str) -> dict:
     if isinstance(bar, Enum):
         bar = bar.value
 
-    payload = {
+    return {
         'conid': contract_id,
         'period': period,
         'bar': bar,
         'exchange': exchange,
-        'outsideRth': outside_regular_trading_hours
+        'outsideRth': outside_regular_trading_hours,
+        'startTime': start_time
     }
-    return make_request(method='get', endpoint='/api/iserver/marketdata/history', params=payload)
@@ -49,6 +49,9 @@ def transactions_history(account_ids: List[str] = None, contract_ids: List[str]
     """Transaction history for a given number of conids and accounts. Types of transactions
     include dividend payments, buy and sell transactions, transfers.
 
+    For repeated syncs use `ibc.ledger.TransactionLedger`, which only
+    requests the days since the previous sync.
+
     Args:
         account_ids (List[str]): A list of account Numbers.
         contract_ids (List[str]): A list contract IDs.
@@ -64,4 +67,4 @@ def transactions_history(account_ids: List[str] = None, contract_ids: List[str]
         'currency': currency,
         'days': days
     }
-    return make_request(method='post', endpoint='/api/pa/summary', json_payload=payload)
+    return make_request(method='post', endpoint='/api/pa/transactions', json_payload=payload)
@@ -1,5 +1,27 @@
+from typing import Union
+from typing import List
+from enum import Enum
+from concurrent.futures import ThreadPoolExecutor
+
 from ibc.celery import app
 from ibc import make_request
+from ibc.cache import TTLCache
+from ibc.cache import hash_key
+from ibc.scanner_params import ScannerParams
+from ibc.tasks.market_data import snapshot
+
+
+# How long, in seconds, the scanner parameters are reused.
+SCANNER_PARAMS_TTL = 24 * 60 * 60
+
+# How long, in seconds, the results of a scanner definition are reused.
+SCANNER_TTL = 30
+
+# The maximum number of contracts requested in one snapshot call.
+SNAPSHOT_BATCH_SIZE = 100
+
+_scanner_params = TTLCache(ttl=SCANNER_PARAMS_TTL, maxsize=1)
+_scanner_results = TTLCache(ttl=SCANNER_TTL)
 
 
 @app.task
@@ -13,12 +35,27 @@ def scanners() -> dict:
     return make_request(method='get', endpoint='/api/iserver/scanner/params')
 
 
+def scanner_params() -> ScannerParams:
+    """Returns the indexed scanner parameters, fetched at most
+    once every `SCANNER_PARAMS_TTL` seconds by this process.
+
+    Returns:
+        ScannerParams: The index used to validate scanner definitions.
+    """
+    return _scanner_params.get_or_set('params', lambda: ScannerParams(scanners()))
+
+
 @app.task
-def run_scanner(scanner: dict) -> dict:
+def run_scanner(scanner: dict, validate: bool = True) -> dict:
     """Runs scanner to get a list of contracts.
 
     Args:
         scanner (dict): A scanner definition that you want to run.
+        validate (bool, optional): Validate and normalize the definition against the
+                                   cached scanner parameters first. Defaults to True.
+
+    Raises:
+        ScannerValidationError: If `validate` is set and the definition is invalid.
 
     Returns:
         celery.chain: Task chain returning collection of `contract` resources
@@ -51,4 +88,89 @@ def run_scanner(scanner: dict) -> dict:
             }
         )
     """
+    if validate:
+        scanner = scanner_params().normalize(scanner)
+
     return make_request(method='post', endpoint='/api/iserver/scanner/run', json_payload=scanner)
+
+
+def cached_scan(scanner: dict, ttl: float = SCANNER_TTL) -> dict:
+    """Runs a scanner, reusing the result of an identical definition
+    run in the last `ttl` seconds by this process.
+
+    Args:
+        scanner (dict): A scanner definition that you want to run.
+        ttl (float, optional): How long the result is reused. Defaults to `SCANNER_TTL`.
+
+    Returns:
+        dict: A collection of `contract` resources.
+    """
+    return _scanner_results.get_or_set(hash_key(scanner), lambda: run_scanner(scanner, validate=False), ttl=ttl)
+
+
+@app.task
+def scan_quotes(scanners: List[dict], fields: List[Union[str, Enum]] = None,
+                ttl: float = SCANNER_TTL, max_workers: int = 8) -> List[dict]:
+    """Runs many scanners at once and joins their hits with live quotes.
+
+    The scanners run concurrently and their results are cached per
+    definition for `ttl` seconds. The contracts returned by all of them
+    are deduplicated and quoted with batched snapshot requests, so a
+    contract found by several scanners is only quoted once.
+
+    Args:
+        scanners (List[dict]): The scanner definitions to run.
+        fields (List[Union[str, Enum]], optional): The `MarketDataFields` to quote. Defaults to the
+                                                   snapshot default fields.
+        ttl (float, optional): How long scanner results are reused. Defaults to `SCANNER_TTL`.
+        max_workers (int, optional): The maximum number of concurrent requests. Defaults to 8.
+
+    Raises:
+        ScannerValidationError: If any definition is invalid, before any scanner runs.
+
+    Returns:
+        List[dict]: One row per scanner hit, the `contract` resource merged with its snapshot
+                    fields and a `scanner` key holding the index of the scanner that found it.
+
+    Usage:
+        >>> scan_quotes(
+            scanners=[
+                {"instrument": "STK", "type": "TOP_PERC_GAIN", "location": "STK.US.MAJOR", "filter": []},
+                {"instrument": "STK", "type": "MOST_ACTIVE", "location": "STK.US.MAJOR", "filter": []}
+            ],
+            fields=[MarketDataFields.LastPrice, MarketDataFields.Volume]
+        )
+    """
+    params = scanner_params()
+    scanners = [params.normalize(scanner) for scanner in scanners]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(lambda scanner: cached_scan(scanner, ttl=ttl), scanners))
+
+        # Collect the hits, keeping the first occurrence order of the contracts.
+        hits = []
+        contract_ids = {}
+        for index, result in enumerate(results):
+            for contract in result.get('contracts', []):
+                hits.append((index, contract))
+                contract_ids.setdefault(str(contract['conid']), None)
+
+        contract_ids = list(contract_ids)
+        batches = [
+            contract_ids[i:i + SNAPSHOT_BATCH_SIZE]
+            for i in range(0, len(contract_ids), SNAPSHOT_BATCH_SIZE)
+        ]
+
+        quotes = {}
+        for batch in executor.map(lambda batch: snapshot(contract_ids=batch, fields=fields), batches):
+            for quote in batch:
+                quotes[str(quote.get('conid'))] = quote
+
+    rows = []
+    for index, contract in hits:
+        row = {'scanner': index}
+        row.update(contract)
+        row.update(quotes.get(str(contract['conid']), {}))
+        rows.append(row)
+
+    return rows
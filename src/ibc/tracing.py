@@ -0,0 +1,167 @@
+import time
+import logging
+
+from contextlib import contextmanager
+
+from celery.signals import before_task_publish
+from celery.signals import after_task_publish
+from celery.signals import task_prerun
+from celery.signals import task_postrun
+
+from ibc.metrics import SENT_AT_HEADER
+
+try:
+    from opentelemetry import context
+    from opentelemetry import propagate
+    from opentelemetry import trace
+except ImportError:
+    trace = None
+
+
+_PROPAGATION_HEADERS = ('traceparent', 'tracestate', 'baggage')
+
+_tracer = None
+_publishing = {}
+_running = {}
+
+
+def enable_tracing(tracer_provider=None) -> None:
+    """Turns on spans for Celery tasks and gateway requests.
+
+    Tracing is off until this is called. Once enabled the library emits
+    a span when a task is published, one covering the time it waited in
+    the broker, one for its execution and one for every gateway request.
+    The trace context travels in the task headers, so tasks started by
+    chains and groups end up in the trace of the task that created them.
+
+    Requires the optional `opentelemetry-api` package, exporting the spans
+    is left to the configured `TracerProvider`.
+
+    Args:
+        tracer_provider (TracerProvider, optional): The provider to create the tracer
+                                                    from. Defaults to the global provider.
+
+    Usage:
+        >>> from ibc import tracing
+        >>> tracing.enable_tracing()
+    """
+    global _tracer
+
+    if trace is None:
+        raise ImportError('Tracing requires the `opentelemetry-api` package.')
+
+    _tracer = trace.get_tracer('ibc', tracer_provider=tracer_provider)
+
+
+def disable_tracing() -> None:
+    """Turns off the spans emitted by the library."""
+    global _tracer
+    _tracer = None
+
+
+@contextmanager
+def request_span(method: str, endpoint: str, current: bool = True):
+    """Wraps a gateway request in a span when tracing is enabled.
+
+    Args:
+        method (str): The request method.
+        endpoint (str): The endpoint template, see `ibc.metrics.endpoint_template`.
+        current (bool, optional): Make the span the current one. Pass `False` from generators,
+            the caller runs its own code between two items. Defaults to True.
+
+    Yields:
+        Span: The active span, or `None` when tracing is disabled.
+    """
+    if _tracer is None:
+        yield None
+        return
+
+    name = f'gateway {method.upper()} {endpoint}'
+    attributes = {'http.method': method.upper(), 'http.route': endpoint}
+
+    if current:
+        with _tracer.start_as_current_span(name, kind=trace.SpanKind.CLIENT, attributes=attributes) as span:
+            yield span
+        return
+
+    span = _tracer.start_span(name, kind=trace.SpanKind.CLIENT, attributes=attributes)
+    try:
+        yield span
+    finally:
+        span.end()
+
+
+def _task_carrier(request) -> dict:
+    headers = getattr(request, 'headers', None) or {}
+    carrier = {}
+
+    for key in _PROPAGATION_HEADERS:
+        value = getattr(request, key, None) or headers.get(key)
+        if value is not None:
+            carrier[key] = value
+
+    return carrier
+
+
+@before_task_publish.connect
+def _start_publish_span(sender: str = None, headers: dict = None, **kwargs) -> None:
+    if _tracer is None or headers is None:
+        return
+
+    span = _tracer.start_span(
+        f'celery.publish {sender}',
+        kind=trace.SpanKind.PRODUCER,
+        attributes={'celery.task_name': sender, 'celery.task_id': headers.get('id')}
+    )
+    _publishing[headers.get('id')] = span
+    propagate.inject(headers, context=trace.set_span_in_context(span))
+
+
+@after_task_publish.connect
+def _end_publish_span(headers: dict = None, **kwargs) -> None:
+    if headers is None:
+        return
+
+    span = _publishing.pop(headers.get('id'), None)
+    if span is not None:
+        span.end()
+
+
+@task_prerun.connect
+def _start_task_span(task_id: str = None, task=None, **kwargs) -> None:
+    if _tracer is None:
+        return
+
+    try:
+        parent = propagate.extract(_task_carrier(task.request))
+        attributes = {'celery.task_name': task.name, 'celery.task_id': task_id}
+
+        # The broker wait is only known once the task starts, so record it after the fact.
+        sent_at = getattr(task.request, SENT_AT_HEADER, None)
+        if sent_at is not None:
+            queued = _tracer.start_span(
+                f'celery.queue {task.name}', context=parent,
+                start_time=int(sent_at * 1e9), attributes=attributes
+            )
+            queued.end(end_time=time.time_ns())
+
+        span = _tracer.start_span(
+            f'celery.run {task.name}', context=parent,
+            kind=trace.SpanKind.CONSUMER, attributes=attributes
+        )
+        token = context.attach(trace.set_span_in_context(span))
+        _running[task_id] = (span, token)
+    except Exception:
+        logging.exception(msg='Failed to start the task span.')
+
+
+@task_postrun.connect
+def _end_task_span(task_id: str = None, state: str = None, **kwargs) -> None:
+    span_token = _running.pop(task_id, None)
+    if span_token is None:
+        return
+
+    span, token = span_token
+    span.set_attribute('celery.state', state or '')
+    span.end()
+    context.detach(token)
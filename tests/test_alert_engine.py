@@ -0,0 +1,103 @@
+import unittest
+
+from unittest import TestCase
+from ibc.alert_engine import AlertEngine
+
+
+class AlertEngineTest(TestCase):
+
+    """Will perform a unit test for the `AlertEngine` object."""
+
+    def setUp(self) -> None:
+        """Create an engine and record the triggered actions."""
+
+        self.engine = AlertEngine()
+        self.fired = []
+
+    def _action(self, alert, value):
+        self.fired.append((alert.alert_id, value))
+
+    def test_rising_crossing(self):
+        """Test that an above alert triggers once the value rises through it."""
+
+        alert_id = self.engine.add(265598, '31', '>=', 150.0, self._action)
+
+        self.engine.on_tick(265598, {'31': '149.50'})
+        self.assertEqual(self.fired, [])
+
+        self.engine.on_tick(265598, {'31': '150.00'})
+        self.assertEqual(self.fired, [(alert_id, 150.0)])
+        self.assertEqual(len(self.engine), 0)
+
+    def test_falling_crossing(self):
+        """Test that a below alert triggers once the value falls through it, with a percent field."""
+
+        alert_id = self.engine.add(265598, '83', '<=', -5.0, self._action)
+
+        self.engine.on_tick(265598, {'83': '-1.2%'})
+        self.engine.on_tick(265598, {'83': '-6.0%'})
+        self.assertEqual(self.fired, [(alert_id, -6.0)])
+
+    def test_first_tick(self):
+        """Test that the first tick triggers the alerts whose condition already holds."""
+
+        above = self.engine.add(265598, '31', '>=', 150.0, self._action)
+        self.engine.add(265598, '31', '>=', 160.0, self._action)
+        below = self.engine.add(265598, '31', '<=', 155.0, self._action)
+
+        self.engine.on_tick(265598, {'31': '152'})
+        self.assertEqual(sorted(self.fired), [(above, 152.0), (below, 152.0)])
+
+    def test_added_after_a_tick(self):
+        """Test that an alert added while its condition holds triggers at once."""
+
+        self.engine.add(265598, '31', '<=', 100.0, self._action)
+        self.engine.on_tick(265598, {'31': '152'})
+
+        once = self.engine.add(265598, '31', '>=', 150.0, self._action)
+        self.assertEqual(self.fired, [(once, 152.0)])
+        self.assertEqual(len(self.engine), 1)
+
+        repeated = self.engine.add(265598, '31', '>=', 150.0, self._action, once=False)
+        self.assertEqual(self.fired[-1], (repeated, 152.0))
+        self.assertEqual(len(self.engine), 2)
+
+    def test_repeated_alert(self):
+        """Test that an alert kept after triggering fires again on the next crossing only."""
+
+        alert_id = self.engine.add(265598, '31', '>=', 150.0, self._action, once=False)
+
+        for price in ('149', '151', '152', '148', '150'):
+            self.engine.on_tick(265598, {'31': price})
+
+        self.assertEqual(self.fired, [(alert_id, 151.0), (alert_id, 150.0)])
+
+    def test_ignored_values(self):
+        """Test that other contracts, other fields and empty values trigger nothing."""
+
+        self.engine.add(265598, '31', '>=', 150.0, self._action)
+
+        self.engine.on_tick(8314, {'31': '200'})
+        self.engine.on_tick(265598, {'84': '200', '31': ''})
+        self.assertEqual(self.fired, [])
+
+    def test_remove(self):
+        """Test that a removed alert no longer triggers."""
+
+        alert_id = self.engine.add(265598, '31', '>=', 150.0, self._action)
+
+        self.assertTrue(self.engine.remove(alert_id))
+        self.assertFalse(self.engine.remove(alert_id))
+
+        self.engine.on_tick(265598, {'31': '151'})
+        self.assertEqual(self.fired, [])
+
+    def test_invalid_operator(self):
+        """Test that an unknown operator is refused."""
+
+        with self.assertRaises(ValueError):
+            self.engine.add(265598, '31', '>', 150.0, self._action)
+
+
+if __name__ == '__main__':
+    unittest.main()
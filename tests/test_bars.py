@@ -0,0 +1,108 @@
+import unittest
+
+from datetime import datetime
+from unittest import TestCase
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:
+    from backports.zoneinfo import ZoneInfo
+
+import numpy as np
+
+from ibc import BarTypes
+from ibc.bars import resample
+from ibc.bars import to_arrays
+
+
+NEW_YORK = ZoneInfo('America/New_York')
+
+
+def _ms(day: str, clock: str) -> int:
+    """Returns the epoch milliseconds of a New York wall clock time."""
+    local = datetime.strptime(f'{day} {clock}', '%Y%m%d %H:%M').replace(tzinfo=NEW_YORK)
+    return int(local.timestamp() * 1000)
+
+
+def _minute_bars(day: str, clocks: list) -> list:
+    return [
+        {'t': _ms(day, clock), 'o': 100.0 + i, 'h': 101.0 + i, 'l': 99.0 + i, 'c': 100.5 + i, 'v': 10}
+        for i, clock in enumerate(clocks)
+    ]
+
+
+class ResampleTest(TestCase):
+
+    """Will perform a unit test for the `resample` function."""
+
+    def setUp(self) -> None:
+        """Build one minute bars on the days around the spring and fall clock changes."""
+
+        clocks = ['09:29', '09:30', '09:31', '10:29', '10:30', '15:59', '16:00']
+        self.days = ['20240308', '20240311', '20241101', '20241104']
+
+        data = []
+        for day in self.days:
+            data.extend(_minute_bars(day, clocks))
+
+        # The response is not always sorted.
+        self.bars = to_arrays({'data': data[::-1]})
+
+    def test_to_arrays(self):
+        """Test that the bars are sorted by time."""
+
+        self.assertTrue(np.all(np.diff(self.bars['t']) > 0))
+        self.assertEqual(len(self.bars['t']), 28)
+
+    def test_hours_anchored_on_the_session_open(self):
+        """Test that hourly buckets start at 09:30 New York time on both sides of a clock change."""
+
+        hours = resample(self.bars, BarTypes.OneHour)
+
+        expected = []
+        for day in self.days:
+            expected.extend(_ms(day, clock) for clock in ('08:30', '09:30', '10:30', '15:30'))
+        self.assertEqual(hours['t'].tolist(), expected)
+
+        # The 09:30 bucket holds 09:30, 09:31 and 10:29 of the first day.
+        self.assertEqual(hours['o'][1], 101.0)
+        self.assertEqual(hours['c'][1], 103.5)
+        self.assertEqual(hours['h'][1], 104.0)
+        self.assertEqual(hours['v'][1], 30)
+
+    def test_regular_hours_only(self):
+        """Test that the bars outside 09:30 to 16:00 are dropped, in standard and daylight time."""
+
+        hours = resample(self.bars, BarTypes.OneHour, rth_only=True)
+
+        self.assertEqual(len(hours['t']), 3 * len(self.days))
+        self.assertEqual(hours['v'].tolist(), [30, 10, 10] * len(self.days))
+
+    def test_days(self):
+        """Test that daily buckets follow the New York calendar whatever the UTC offset."""
+
+        days = resample(self.bars, BarTypes.OneDay)
+
+        self.assertEqual(days['t'].tolist(), [_ms(day, '09:29') for day in self.days])
+        self.assertEqual(days['v'].tolist(), [70] * len(self.days))
+        self.assertEqual(days['c'].tolist(), [106.5] * len(self.days))
+
+    def test_weeks_and_months(self):
+        """Test that weeks start on Monday and months follow the calendar."""
+
+        weeks = resample(self.bars, BarTypes.OneWeek)
+        months = resample(self.bars, BarTypes.OneMonth)
+
+        self.assertEqual(weeks['v'].tolist(), [70] * len(self.days))
+        self.assertEqual(months['v'].tolist(), [140, 140])
+        self.assertEqual(resample(self.bars, BarTypes.OneMonth, rth_only=True)['v'].tolist(), [100, 100])
+
+    def test_empty(self):
+        """Test that no bars give empty columns."""
+
+        empty = resample(to_arrays({'data': []}), BarTypes.OneHour)
+        self.assertEqual(len(empty['t']), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import json
+import unittest
+
+from unittest import TestCase
+from ibc.decoding import iter_array
+
+
+def _split(body: str, size: int) -> list:
+    """Cuts a body in chunks of `size` bytes, splitting multi-byte characters too."""
+    raw = body.encode('utf-8')
+    return [raw[i:i + size] for i in range(0, len(raw), size)]
+
+
+class IterArrayTest(TestCase):
+
+    """Will perform a unit test for the `iter_array` function."""
+
+    def setUp(self) -> None:
+        """Build a body with numbers, strings and nested values."""
+
+        self.items = [
+            {'t': 1700000000000, 'o': 150.25, 'c': -1.5e-3, 'v': 12},
+            {'symbol': 'Société Générale', 'tags': ['a', 'b'], 'none': None},
+            12345,
+            -0.5,
+            'text with , ] and }',
+            [1, [2, [3]]]
+        ]
+        self.body = json.dumps(self.items)
+
+    def test_every_chunk_size(self):
+        """Test that the items are the same wherever the chunks are split."""
+
+        for size in range(1, len(self.body) + 1):
+            with self.subTest(size=size):
+                self.assertEqual(list(iter_array(_split(self.body, size))), self.items)
+
+    def test_compact_and_spaced_bodies(self):
+        """Test bodies with and without whitespace around the delimiters."""
+
+        compact = json.dumps(self.items, separators=(',', ':'))
+        spaced = json.dumps(self.items, indent=4)
+
+        self.assertEqual(list(iter_array(_split(compact, 7))), self.items)
+        self.assertEqual(list(iter_array(_split(spaced, 7))), self.items)
+
+    def test_number_at_chunk_end(self):
+        """Test that a number cut at the end of a chunk is not yielded early."""
+
+        self.assertEqual(list(iter_array([b'[12', b'34', b'5, 6', b'7]'])), [12345, 67])
+
+    def test_path(self):
+        """Test finding the array under dotted keys, after other keys of any type."""
+
+        body = json.dumps({
+            'symbol': 'AAPL',
+            'meta': {'data': [0], 'points': 3},
+            'result': {'count': 2, 'data': self.items}
+        })
+
+        for size in (1, 5, 64):
+            with self.subTest(size=size):
+                self.assertEqual(list(iter_array(_split(body, size), path='result.data')), self.items)
+
+    def test_missing_path(self):
+        """Test that a missing key yields nothing."""
+
+        self.assertEqual(list(iter_array([b'{"symbol": "AAPL"}'], path='data')), [])
+        self.assertEqual(list(iter_array([b'{}'], path='data')), [])
+
+    def test_empty_arrays(self):
+        """Test empty arrays, at the top and under a path."""
+
+        self.assertEqual(list(iter_array([b'[]'])), [])
+        self.assertEqual(list(iter_array([b' [', b' \n', b' ] '])), [])
+        self.assertEqual(list(iter_array([b'{"data": []}'], path='data')), [])
+
+    def test_truncated_body(self):
+        """Test that a body cut short raises instead of ending quietly."""
+
+        with self.assertRaises(ValueError):
+            list(iter_array(_split(self.body[:-10], 8)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+
+from unittest import TestCase
+from unittest import mock
+from ibc import gateways
+from ibc.gateways import Gateway
+from ibc.gateways import GatewayPool
+
+
+class _Response:
+
+    def __init__(self, status_code: int = 200) -> None:
+        self.status_code = status_code
+        self.ok = status_code < 400
+
+
+class GatewayPoolTest(TestCase):
+
+    """Will perform a unit test for the `GatewayPool` object."""
+
+    def setUp(self) -> None:
+        """Create a pool of two gateways recording the requests they receive."""
+
+        self.sent = []
+        self.status = {}
+        self.gateways = [Gateway(f'https://ibgw-{name}:5000/v1', name=f'ibgw-{name}') for name in ('a', 'b')]
+
+        for gateway in self.gateways:
+            gateway.session.request = self._recorder(gateway)
+
+        self.pool = GatewayPool(self.gateways)
+
+    def _recorder(self, gateway: Gateway):
+        def _request(method, url, **kwargs):
+            self.sent.append((gateway.name, url[len(gateway.url):]))
+            return _Response(self.status.get(gateway.name, 200))
+        return _request
+
+    def test_pre_calls_reach_every_gateway(self):
+        """Test that the session pre-calls are sent to every gateway, whatever the account routed next."""
+
+        for account_id in ('U7654321', 'U2222222'):
+            self.sent.clear()
+            self.pool.request('GET', '/api/portfolio/accounts')
+            self.pool.request('GET', f'/api/portfolio/{account_id}/summary', account_id=account_id)
+
+            home = self.sent[-1][0]
+            self.assertIn((home, '/api/portfolio/accounts'), self.sent)
+            self.assertEqual(len(self.sent), 3)
+
+    def test_affinity(self):
+        """Test that an account and a contract always go to the same gateway."""
+
+        for _ in range(3):
+            self.pool.request('GET', '/api/portfolio/U7654321/summary', account_id='U7654321')
+            self.pool.request('GET', '/api/iserver/marketdata/snapshot', contract_id='265598')
+
+        by_endpoint = {}
+        for name, endpoint in self.sent:
+            by_endpoint.setdefault(endpoint, set()).add(name)
+        self.assertEqual([len(names) for names in by_endpoint.values()], [1, 1])
+
+    def test_shards(self):
+        """Test that `shards` overrides the hashing of an account."""
+
+        for name in ('ibgw-a', 'ibgw-b'):
+            pool = GatewayPool(self.gateways, shards={'U7654321': name})
+            self.assertEqual(pool.home(account_id='U7654321').name, name)
+
+    def test_contract_of(self):
+        """Test finding the contract of the market data requests only."""
+
+        self.assertEqual(gateways.contract_of('/api/iserver/marketdata/snapshot', {'conids': '265598,8314'}),
+                         '265598')
+        self.assertEqual(gateways.contract_of('/api/iserver/marketdata/history', {'conid': 8314}), '8314')
+        self.assertEqual(gateways.contract_of('/api/iserver/marketdata/265598/unsubscribe'), '265598')
+        self.assertIsNone(gateways.contract_of('/api/portfolio/U1234567/positions/0'))
+
+    def test_session_lost_fails_over(self):
+        """Test that a GET fails over from a gateway that lost its session, which is then tried last."""
+
+        home = self.pool.home(account_id='U7654321')
+        self.status[home.name] = 401
+
+        response = self.pool.request('GET', '/api/portfolio/U7654321/summary', account_id='U7654321')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(home.healthy)
+        self.assertIs(self.pool.route(account_id='U7654321')[-1], home)
+
+    def test_restored_gateway_gets_the_pre_calls(self):
+        """Test that a health check restoring a gateway sends it the pre-calls made so far."""
+
+        self.pool.request('GET', '/api/iserver/accounts')
+        self.gateways[1].healthy = False
+        self.sent.clear()
+
+        with mock.patch.object(Gateway, 'check_health', lambda gateway: setattr(gateway, 'healthy', True) or True):
+            self.pool.check_health()
+
+        self.assertEqual(self.sent, [('ibgw-b', '/api/iserver/accounts')])
+
+
+if __name__ == '__main__':
+    unittest.main()
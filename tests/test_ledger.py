@@ -0,0 +1,141 @@
+import shutil
+import tempfile
+import unittest
+
+from datetime import date
+from datetime import timedelta
+from unittest import TestCase
+from unittest import mock
+from ibc.ledger import TransactionLedger
+
+
+def _transaction(conid: int, day: str, quantity: float, price: float) -> dict:
+    return {
+        'conid': conid,
+        'rawDate': day,
+        'type': 'Buy' if quantity > 0 else 'Sell',
+        'qty': quantity,
+        'pr': price,
+        'amt': -quantity * price,
+        'cur': 'USD',
+        'fxRate': 1,
+        'desc': 'Apple Inc'
+    }
+
+
+class TransactionLedgerTest(TestCase):
+
+    """Will perform a unit test for the `TransactionLedger` object."""
+
+    def setUp(self) -> None:
+        """Create a ledger in a temporary directory and a fake transaction history."""
+
+        self.root = tempfile.mkdtemp()
+        self.ledger = TransactionLedger(root=self.root)
+
+        self.history = [
+            _transaction(265598, '20240102', 10, 180.0),
+            _transaction(265598, '20240103', 5, 181.0),
+            _transaction(265598, '20240103', 5, 181.0)
+        ]
+        self.calls = []
+
+        patcher = mock.patch('ibc.ledger.transactions_history', side_effect=self._transactions_history)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self) -> None:
+        """Remove the ledger files."""
+
+        shutil.rmtree(self.root)
+
+    def _sync(self, contract_ids: list, today: date, ledger: TransactionLedger = None, **kwargs) -> dict:
+        self.today = today
+        return (ledger or self.ledger).sync('U1234567', contract_ids, today=today, **kwargs)
+
+    def _transactions_history(self, account_ids, contract_ids, currency, days):
+        """Returns the transactions of the last `days` days, like the gateway."""
+        self.calls.append((tuple(contract_ids), days))
+        first = (self.today - timedelta(days=days - 1)).strftime('%Y%m%d')
+        return {'transactions': [
+            transaction for transaction in self.history
+            if str(transaction['conid']) in contract_ids and transaction['rawDate'] >= first
+        ]}
+
+    def test_first_sync(self):
+        """Test that the first sync fetches `max_days` and keeps identical transactions of a day."""
+
+        added = self._sync(['265598'], date(2024, 1, 3), max_days=30)
+
+        self.assertEqual(added, {'265598': 3})
+        self.assertEqual(self.calls, [(('265598',), 30)])
+        self.assertEqual(self.ledger.last_synced('U1234567', '265598'), '20240103')
+        self.assertEqual(self.ledger.query('U1234567', '265598')['quantity'], [10, 5, 5])
+
+    def test_overlapping_sync(self):
+        """Test that refetched days only add the transactions not stored yet."""
+
+        self._sync(['265598'], date(2024, 1, 3))
+
+        self.history.append(_transaction(265598, '20240103', 5, 181.0))
+        self.history.append(_transaction(265598, '20240104', -20, 183.0))
+        added = self._sync(['265598'], date(2024, 1, 4))
+
+        self.assertEqual(added, {'265598': 2})
+        self.assertEqual(self.calls[-1], (('265598',), 2))
+        self.assertEqual(self.ledger.query('U1234567', '265598')['quantity'], [10, 5, 5, 5, -20])
+
+        self.assertEqual(self._sync(['265598'], date(2024, 1, 4)), {'265598': 0})
+
+    def test_resume(self):
+        """Test that a new ledger on the same directory resumes from the stored state."""
+
+        self._sync(['265598'], date(2024, 1, 3))
+
+        ledger = TransactionLedger(root=self.root)
+        self.assertEqual(ledger.last_synced('U1234567', '265598'), '20240103')
+        self.assertEqual(ledger.query('U1234567', '265598')['date'], ['20240102', '20240103', '20240103'])
+
+        self.history.append(_transaction(265598, '20240110', 1, 185.0))
+        added = self._sync(['265598'], date(2024, 1, 10), ledger=ledger)
+
+        self.assertEqual(added, {'265598': 1})
+        self.assertEqual(self.calls[-1], (('265598',), 8))
+
+    def test_long_gap(self):
+        """Test that a sync after more than `max_days` fetches every day since the last one."""
+
+        self._sync(['265598'], date(2024, 1, 3), max_days=30)
+
+        self.history.append(_transaction(265598, '20240110', 1, 185.0))
+        self.history.append(_transaction(265598, '20240301', 2, 190.0))
+        added = self._sync(['265598'], date(2024, 3, 1), max_days=30)
+
+        self.assertEqual(added, {'265598': 2})
+        self.assertEqual(self.calls[-1], (('265598',), 59))
+        self.assertEqual(self.ledger.query('U1234567', '265598')['quantity'], [10, 5, 5, 1, 2])
+
+    def test_windows_are_shared(self):
+        """Test that contracts needing the same window share one request."""
+
+        self.history.append(_transaction(8314, '20240103', 100, 25.0))
+        self._sync(['265598'], date(2024, 1, 3))
+        self.calls.clear()
+
+        added = self._sync(['265598', '8314', '4815'], date(2024, 1, 3))
+
+        self.assertEqual(added, {'265598': 0, '8314': 1, '4815': 0})
+        self.assertEqual(sorted(self.calls), [(('265598',), 1), (('8314', '4815'), 90)])
+
+    def test_query_range(self):
+        """Test that the query bounds are inclusive."""
+
+        self._sync(['265598'], date(2024, 1, 3))
+
+        self.assertEqual(self.ledger.query('U1234567', '265598', start='20240103')['quantity'], [5, 5])
+        self.assertEqual(self.ledger.query('U1234567', '265598', end='20240102')['quantity'], [10])
+        self.assertEqual(self.ledger.query('U1234567', '8314')['date'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import time
+import unittest
+import threading
+
+from unittest import TestCase
+from ibc.limiter import AdaptiveLimit
+from ibc.limiter import AdaptiveLimiter
+from ibc.limiter import endpoint_class
+
+
+class AdaptiveLimitTest(TestCase):
+
+    """Will perform a unit test for the `AdaptiveLimit` object."""
+
+    def setUp(self) -> None:
+        """Create a limit with a known baseline."""
+
+        self.limit = AdaptiveLimit(initial=4, min_limit=1, max_limit=6)
+        self.limit.acquire()
+        self.limit.release(200, 0.1)
+
+    def _request(self, status_code: int, seconds: float) -> None:
+        self.limit.acquire()
+        self.limit.release(status_code, seconds)
+
+    def test_increase(self):
+        """Test that fast responses grow the limit by about one per limit of requests, up to `max_limit`."""
+
+        self.assertAlmostEqual(self.limit.limit, 4.25)
+
+        for _ in range(4):
+            self._request(200, 0.1)
+        self.assertGreater(self.limit.limit, 5.0)
+
+        for _ in range(100):
+            self._request(200, 0.12)
+        self.assertEqual(self.limit.limit, 6)
+        self.assertEqual(self.limit.baseline, 0.1)
+
+    def test_slow_response(self):
+        """Test that a response slower than `tolerance` times the baseline shrinks the limit by `slowdown`."""
+
+        self._request(200, 0.2)
+        self.assertAlmostEqual(self.limit.limit, 4.25 * 0.9)
+
+    def test_throttled(self):
+        """Test that throttled and failed requests shrink the limit by `backoff`, down to `min_limit`."""
+
+        self._request(429, 0.1)
+        self.assertAlmostEqual(self.limit.limit, 4.25 * 0.5)
+
+        for status_code in (503, 0, 429, 503):
+            time.sleep(0.01)
+            self._request(status_code, 0.001)
+        self.assertEqual(self.limit.limit, 1)
+
+    def test_burst_decreases_once(self):
+        """Test that requests sent before the last decrease do not decrease the limit again."""
+
+        self._request(429, 0.1)
+        self._request(429, 0.1)
+        self._request(503, 0.1)
+        self.assertAlmostEqual(self.limit.limit, 4.25 * 0.5)
+
+    def test_acquire_waits(self):
+        """Test that `acquire` blocks while the limit is reached and reports the wait."""
+
+        limit = AdaptiveLimit(initial=1)
+        self.assertEqual(limit.acquire(), 0.0)
+
+        waits = []
+        waiter = threading.Thread(target=lambda: waits.append(limit.acquire()))
+        waiter.start()
+
+        time.sleep(0.05)
+        self.assertEqual(limit.in_flight, 1)
+        limit.release(200, 0.01)
+        waiter.join(timeout=5)
+
+        self.assertEqual(limit.in_flight, 1)
+        self.assertGreater(waits[0], 0.0)
+
+
+class AdaptiveLimiterTest(TestCase):
+
+    """Will perform a unit test for the `AdaptiveLimiter` object."""
+
+    def test_endpoint_classes(self):
+        """Test that every template is a class of its own unless `CLASSES` groups it."""
+
+        self.assertEqual(endpoint_class('/api/iserver/marketdata/snapshot'), '/api/iserver/marketdata/snapshot')
+        self.assertNotEqual(endpoint_class('/api/iserver/marketdata/snapshot'),
+                            endpoint_class('/api/iserver/marketdata/history'))
+        for template in ('/api/iserver/account/{id}/order', '/api/iserver/account/{id}/order/{id}',
+                         '/api/iserver/account/{id}/order/whatif', '/api/iserver/reply/{id}'):
+            self.assertEqual(endpoint_class(template), endpoint_class('/api/iserver/account/{id}/orders'))
+
+    def test_limits(self):
+        """Test that the limiter keeps one limit per class."""
+
+        limiter = AdaptiveLimiter(initial=2)
+
+        limiter.acquire('/api/iserver/marketdata/snapshot')
+        limiter.release('/api/iserver/marketdata/snapshot', 429, 0.1)
+        limiter.acquire('/api/iserver/marketdata/history')
+        limiter.release('/api/iserver/marketdata/history', 200, 0.1)
+
+        self.assertEqual(limiter.limits(), {
+            '/api/iserver/marketdata/snapshot': 1.0,
+            '/api/iserver/marketdata/history': 2.5
+        })
+        self.assertIs(limiter.limit('/api/iserver/account/{id}/orders'),
+                      limiter.limit('/api/iserver/account/{id}/order/whatif'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import sys
+import unittest
+import subprocess
+
+from unittest import TestCase
+from ibc.shared_quotes import SharedQuoteTable
+
+
+# Run by an unrelated interpreter, which has a resource tracker of its own like a worker.
+READER = """
+import sys
+from ibc.shared_quotes import SharedQuoteTable
+
+table = SharedQuoteTable.attach(sys.argv[1])
+print(float(table.read(265598)['last']))
+table.close()
+"""
+
+
+class SharedQuoteTableTest(TestCase):
+
+    """Will perform a unit test for the `SharedQuoteTable` object."""
+
+    def setUp(self) -> None:
+        """Create a table with one quote."""
+
+        self.name = f'ibc-test-{os.getpid()}'
+        self.table = SharedQuoteTable.create(self.name, capacity=16)
+        self.table.ingest([{'conid': 265598, '31': '150.25', '84': '150.24', '86': '150.26', '_updated': 1}])
+
+    def tearDown(self) -> None:
+        """Free the table."""
+
+        self.table.close()
+
+    def test_read(self):
+        """Test reading a row and its missing fields."""
+
+        row = self.table.read(265598)
+        self.assertEqual(row['last'], 150.25)
+        self.assertEqual(row['bid'], 150.24)
+        self.assertNotEqual(row['volume'], row['volume'])
+        self.assertEqual(row['seq'] % 2, 0)
+        self.assertIsNone(self.table.read(8314))
+
+    def test_readers_exiting_keep_the_table(self):
+        """Test that a reader process exiting does not free the table of the others."""
+
+        environment = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+
+        for _ in range(2):
+            reader = subprocess.run([sys.executable, '-c', READER, self.name], env=environment,
+                                    capture_output=True, text=True, timeout=60)
+            self.assertEqual(reader.returncode, 0, reader.stderr)
+            self.assertEqual(reader.stdout.strip(), '150.25')
+
+
+if __name__ == '__main__':
+    unittest.main()